@@ -5,11 +5,30 @@
 # positions and interact with atoms and deflections. If no rays are struck, ray will have an exit point.
 # BlackBoxGame contains a game board, has methods to add atoms to the board, and to shoot rays within the board.
 # The class also keeps score and allows a user to guess the position of atoms within the board.
+# The state of a game can be saved and restored as a compact snapshot of integer bitboards (one bit per position of
+# the 10x10 board, bit row * 10 + column) for atoms, guesses and marked border positions plus a packed score. Packed
+# to bytes, only the positions that can hold an atom or a mark take bits.
+
+import instrumentation
+
+_MARKS = {'': 0, 'H': 1, 'R': 2, 'D': 3}                 # 2-bit codes of border position marks in a snapshot
+_MARK_LETTERS = ('', 'H', 'R', 'D')
+_SCORE_OFFSET = 1 << 15                                  # packed scores are stored as unsigned 16-bit values
+SNAPSHOT_SIZE = 32                                       # bytes of a packed snapshot: 8 + 13 + 8 + 3
+CELLS = [(row, column) for row in range(1, 9) for column in range(1, 9)]    # positions inside the black box
+ENTRIES = ([(0, column) for column in range(1, 9)] + [(9, column) for column in range(1, 9)] +
+           [(row, 0) for row in range(1, 9)] + [(row, 9) for row in range(1, 9)])    # border positions to shoot from
+_CELL_BITS = [1 << (row * 10 + column) for row, column in CELLS]         # bitboard bit of each position in CELLS
+_ENTRY_SHIFTS = [2 * (row * 10 + column) for row, column in ENTRIES]     # mark shift of each position in ENTRIES
+_CELL_MASK = sum(_CELL_BITS)                                            # the positions that can hold an atom
+_ENTRY_MASK = sum(3 << shift for shift in _ENTRY_SHIFTS)                 # the mark bits of positions that can be marked
 
 
 class Atom:
     """Represents an atom with a position in a row and column and 1-4 deflection points"""
 
+    __slots__ = ('_position', '_row', '_column', '_deflections', '_reflections')
+
     def __init__(self, row, column):                    # takes row column parameters
         self._position = (row, column)
         self._row = row
@@ -58,15 +77,20 @@ class Ray:
     Results include a hit (1 point, no exit), a reflection (1 point and same exit as entry), a deflection (2 points)
     and a miss (2 points)
     """
+
+    __slots__ = ('_row', '_column', '_board', '_path', '_exit_point')
+
     def __init__(self, row, column, board_object):
         self._row = row
         self._column = column
         self._board = board_object
+        self._path = []                                 # cells stepped into while the ray is routed
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
         self._exit_point = self.route()
-        if self._exit_point is None or self._exit_point == (self._row, self._column):   # if hit or reflection
-            self._score = -1                                                            # negative 1 score
-        else:                                                                           # if deflection or miss
-            self._score = -2                                                            # negative 2 score
+        if probe is not None:
+            self._record_route(probe, start)
 
     def get_ray_result(self):
         """
@@ -75,11 +99,41 @@ class Ray:
         """
         return self._exit_point
 
-    def get_ray_score(self):
+    def get_ray_score(self, scoring=None):
         """
-        :return: The score value for the given ray; a negative integer
+        :param scoring: the ScoringPolicy to score the ray with (optional; the standard rules if None)
+        :return: The score value for the given ray; a negative integer under the standard rules
         """
-        return self._score
+        if scoring is None:
+            scoring = _DEFAULT_SCORING
+        return scoring.ray_score((self._row, self._column), self._exit_point)
+
+    def get_ray_path(self):
+        """
+        :return: the list of (row, column) positions the ray stepped into, in order, including the exit point or the
+        position of the atom that was hit
+        """
+        return self._path
+
+    def _record_route(self, probe, start):
+        """
+        Records the routing of the ray to the instrumentation probe: the number of cells stepped into, the number of
+        direction changes (a reflection counts as one) and the nanoseconds since start.
+        :return: none
+        """
+        elapsed = instrumentation.now() - start
+        turns = 0
+        previous, direction = (self._row, self._column), None
+        for position in self._path:
+            step = (position[0] - previous[0], position[1] - previous[1])
+            if direction is not None and step != direction:
+                turns += 1
+            previous, direction = position, step
+        probe.add('ray.routes')
+        probe.add('ray.steps', len(self._path))
+        probe.maximum('ray.steps_max', len(self._path))
+        probe.add('ray.turns', turns)
+        probe.add('ray.route_ns', elapsed)
 
     def route(self):
         """
@@ -107,6 +161,7 @@ class Ray:
         :return: a tuple of the exit point of the ray (or none if none occurs)
         """
         step = self._board[row+1][column]
+        self._path.append((row + 1, column))
         if type(step) == str:                       # base case: if the ray reaches an edge/exit point
             return row + 1, column                  # returns the position of the exit point
         if step is None:                            # if no atoms/deflections/reflections encountered
@@ -129,6 +184,7 @@ class Ray:
         :return: a tuple of the exit point of the ray (or none if none occurs)
         """
         step = self._board[row-1][column]
+        self._path.append((row - 1, column))
         if type(step) == str:                           # if the ray reaches an edge/exit point
             return row - 1, column                      # returns the position of the exit point
         if step is None:                                # if no atoms/deflections/reflections encountered
@@ -151,6 +207,7 @@ class Ray:
         :return: a tuple of the exit point of the ray (or none if none occurs)
         """
         step = self._board[row][column+1]
+        self._path.append((row, column + 1))
         if type(step) == str:                       # if the ray reaches an edge/exit point
             return row, column + 1                  # returns the position of the exit point
         if step is None:                            # if no atoms/deflections/reflections encountered
@@ -173,6 +230,7 @@ class Ray:
         :return: a tuple of the exit point of the ray (or none if none occurs)
         """
         step = self._board[row][column-1]
+        self._path.append((row, column - 1))
         if type(step) == str:                       # if the ray reaches an edge/exit point
             return row, column - 1                  # returns the position of the exit point
         if step is None:                            # if no atoms/deflections/reflections encountered
@@ -187,6 +245,44 @@ class Ray:
             return None                             # none = no exit point
 
 
+class ScoringPolicy:
+    """
+    Represents the scoring rules of a BlackBoxGame: a starting score of 25, 1 point deducted for a hit or a reflection,
+    2 points deducted for a deflection or a miss and 5 points deducted for an incorrect guess.
+    Other rules can be used by passing an object with the same methods to BlackBoxGame.
+    """
+
+    def start_score(self):
+        """
+        :return: the score of a new game
+        """
+        return 25
+
+    def ray_score(self, entry, result):
+        """
+        :param entry: the (row, column) border position the ray was shot from
+        :param result: the exit point of the ray, or None if a hit occurs
+        :return: the change in score for shooting the ray
+        """
+        if result is None or result == entry:               # if hit or reflection
+            return -1
+        else:                                               # if deflection or miss
+            return -2
+
+    def guess_score(self, correct):
+        """
+        :param correct: True if the guessed position holds an atom
+        :return: the change in score for the guess
+        """
+        if correct:
+            return 0
+        else:
+            return -5
+
+
+_DEFAULT_SCORING = ScoringPolicy()
+
+
 class BlackBoxGame:
     """
     Represents the row and column positions of a 10x10 black box game
@@ -197,16 +293,21 @@ class BlackBoxGame:
     and to notify the user of the current score.
     """
 
-    def __init__(self, atoms_list):
+    def __init__(self, atoms_list, ray_cache=None, scoring=None, event_log=None):
         """
         :param atoms_list: a list of ordered pair tuples representing row and column positions of atoms (1-8)
+        :param ray_cache: a dict of entry positions to traced Ray objects to share with other games that have the same
+        list of atoms (optional). The game stops sharing it as soon as one of its atoms is placed or removed.
+        :param scoring: the ScoringPolicy used to score rays and guesses (optional; the standard rules if None)
+        :param event_log: an event log (such as game_log.EventLog) that the construction of the game and every shot,
+        guess, atom placement, atom removal, snapshot and restore are recorded to (optional)
         :returns: nothing
         Initializes the empty game board as a list of 10 rows, each a list with 10 column positions.
         Updates the game board to represent the placing of each atom by updating the value to 1.
         If the user passes a tuple that represents a position outside of the black box the board will not be updated.
         Also initializes private data members for the score (25)
         and the number of atoms that have not been guessed (the length of the passed list of tuple positions)
-        and an empty list to store previous atom guesses
+        and empty bitboards of the atoms, the previous atom guesses and the marked border positions
         """
         self._black_box = [['C', '', '', '', '', '', '', '', '', 'C'],
                            ['', None, None, None, None, None, None, None, None, ''],
@@ -218,30 +319,153 @@ class BlackBoxGame:
                            ['', None, None, None, None, None, None, None, None, ''],
                            ['', None, None, None, None, None, None, None, None, ''],
                            ['C', '', '', '', '', '', '', '', '', 'C']]
-        self._atom_positions = atoms_list
-        self._atoms = [self.add_atom(pos[0], pos[1]) for pos in atoms_list]     # for each position, add an atom
-        self._score = 25
+        self._atoms = {}                # position -> list of atom objects there (several if atoms_list repeats it)
+        for pos in atoms_list:                                                  # for each position, add an atom
+            self._atoms.setdefault((pos[0], pos[1]), []).append(self.add_atom(pos[0], pos[1]))
+        self._scoring = _DEFAULT_SCORING if scoring is None else scoring
+        self._score = self._scoring.start_score()
         self._atoms_left = len(atoms_list)
-        self._atom_guesses = []                                                 # empty list to store guesses
+        self._atom_bits = 0                                                     # bitboard of atom positions
+        self._guess_bits = 0                                                    # bitboard of guessed positions
+        self._off_board_guesses = set()         # guessed positions outside the 10x10 board, which have no bit
+        self._marks = 0                 # 2 bits per position: the 'H', 'R' or 'D' mark of a border position
+        self._cell_counts = {}          # position -> [atoms, quadrant 1, quadrant 2, quadrant 3, quadrant 4] counts
+        self._atom_cells = {}           # position -> atom object occupying that position
+        self._ray_cache = {}            # entry position -> traced Ray object
+        self._cell_rays = {}            # position -> set of entry positions whose cached ray stepped into it
+        self._shared_rays = False                                               # True while ray_cache is shared
         self.update_board()                                                     # places atoms/deflections on board
+        if ray_cache is not None:
+            self._ray_cache = ray_cache
+            self._shared_rays = True
+        self._event_log = event_log
+        self._log_id = None if event_log is None else event_log.construct(atoms_list)
 
     def update_board(self):
         """
-        Takes no parameters and updates the board to include deflections (represented by integer 1-4 depending on
-        quadrant relative to atom) and reflections (occurring when two atoms are separated by one space, represented
-        bu integer 0). Only assigns integer values if space not occupied by an atom and space is in the black box.
-        Does not change border positions.
+        Takes no parameters and rebuilds the board from the list of atoms to include deflections (represented by
+        integer 1-4 depending on quadrant relative to atom) and reflections (occurring when two atoms are separated by
+        one space, represented bu integer 0). Only assigns integer values if space not occupied by an atom and space is
+        in the black box. Does not change border positions.
+        Every cell keeps a count of the atoms occupying it and of the atoms deflecting into it from each quadrant, so
+        single atoms can later be placed or removed without a rebuild (see place_atom and remove_atom).
         :return: none
         """
-        for atom in self._atoms:                                                # for each atom in the list of atoms
-            self._black_box[atom.get_row()][atom.get_column()] = atom           # place atom object in the position
-            deflections = atom.get_deflections()                                # pull out dict of deflections
-            for quadrant in deflections:                                        # for each entry in the dict
-                position = deflections[quadrant]                                # pull out the position value
-                if self._black_box[position[0]][position[1]] in range(1, 5):    # if a deflection is already there
-                    self._black_box[position[0]][position[1]] = 0               # double deflection - reflection
-                elif self._black_box[position[0]][position[1]] is None:         # if no atom is in that location
-                    self._black_box[position[0]][position[1]] = quadrant        # add quadrant value in deflection pos
+        self._cell_counts = {}
+        self._atom_cells = {}
+        self._ray_cache = {}
+        self._cell_rays = {}
+        self._shared_rays = False
+        self._atom_bits = 0
+        for row in range(1, 9):                                                 # clear the inside of the black box
+            for column in range(1, 9):
+                self._black_box[row][column] = None
+        for atoms in self._atoms.values():                                      # for each atom of each position
+            for atom in atoms:
+                self._apply_atom(atom, 1)                                       # count atom and its deflections
+
+    def _apply_atom(self, atom, change):
+        """
+        :param atom: the atom object being placed or removed
+        :param change: 1 when the atom is placed, -1 when it is removed
+        :return: none
+        Adjusts the counts of the atom's position and of its deflection positions inside the black box, recomputes
+        the value of each of those cells and invalidates cached rays that stepped into any of them.
+        """
+        position = (atom.get_row(), atom.get_column())
+        counts = self._cell_counts.setdefault(position, [0, 0, 0, 0, 0])
+        counts[0] += change                                                     # index 0 counts atoms in the cell
+        if change > 0:
+            self._atom_cells[position] = atom
+            self._atom_bits |= 1 << (position[0] * 10 + position[1])
+        elif counts[0] == 0:
+            del self._atom_cells[position]
+            self._atom_bits &= ~(1 << (position[0] * 10 + position[1]))
+        touched = [position]
+        deflections = atom.get_deflections()
+        for quadrant in deflections:                                            # for each entry in the dict
+            deflection = deflections[quadrant]
+            if type(self._black_box[deflection[0]][deflection[1]]) == str:     # border positions are never changed
+                continue
+            self._cell_counts.setdefault(deflection, [0, 0, 0, 0, 0])[quadrant] += change
+            touched.append(deflection)
+        for cell in touched:
+            self._refresh_cell(cell)
+            self._invalidate_rays(cell)
+
+    def _refresh_cell(self, position):
+        """
+        :param position: a (row, column) position inside the black box
+        :return: none
+        Sets the board value of the position from its counts: the atom object if any atom occupies it, otherwise the
+        quadrant (1-4) of a single deflection, 0 for a reflection where deflections overlap, or None if empty.
+        """
+        counts = self._cell_counts[position]
+        deflections = counts[1] + counts[2] + counts[3] + counts[4]
+        if counts[0] > 0:                                                       # an atom occupies the cell
+            value = self._atom_cells[position]
+        elif deflections == 0:                                                  # nothing deflects into the cell
+            value = None
+        elif deflections == 1:                                                  # a single deflection
+            value = counts.index(1, 1)
+        else:                                                                   # double deflection - reflection
+            value = 0
+        self._black_box[position[0]][position[1]] = value
+
+    def _invalidate_rays(self, position):
+        """
+        :param position: a (row, column) position whose value may have changed
+        :return: none
+        Drops cached rays that stepped into the position; rays that never reached it are unaffected by the change.
+        A cache shared with other games is left to them and the game starts its own.
+        """
+        if self._shared_rays:
+            self._ray_cache = {}
+            self._cell_rays = {}
+            self._shared_rays = False
+        for entry in self._cell_rays.pop(position, ()):
+            self._ray_cache.pop(entry, None)
+
+    def place_atom(self, row, column):
+        """
+        :param row and column: the position of the atom to be placed inside the black box
+        :return: True if the atom was placed, False if the position is already occupied by an atom or not in the box
+        Places a single atom without rebuilding the board. Only the atom's position and its (up to) 4 deflection
+        positions are updated and only cached rays that stepped into those positions are traced again.
+        Unless its position has already been guessed, the atom counts towards the atoms left to be guessed.
+        """
+        if not (1 <= row <= 8 and 1 <= column <= 8):
+            return False
+        if self._event_log is not None:
+            self._event_log.place(self._log_id, row, column)
+        atom = self.add_atom(row, column)
+        if atom is None:
+            return False
+        self._atoms[(row, column)] = [atom]
+        if not self._guess_bits >> (row * 10 + column) & 1:
+            self._atoms_left += 1
+        self._apply_atom(atom, 1)
+        return True
+
+    def remove_atom(self, row, column):
+        """
+        :param row and column: the position of the atom to be removed
+        :return: True if an atom was removed, False if there is no atom in that position
+        Removes a single atom without rebuilding the board, undoing its deflections and reflections.
+        If the atom had not been guessed yet, it no longer counts towards the atoms left to be guessed.
+        """
+        atoms = self._atoms.get((row, column))
+        if not atoms:
+            return False
+        if self._event_log is not None:
+            self._event_log.remove(self._log_id, row, column)
+        atom = atoms.pop()
+        if not atoms:
+            del self._atoms[(row, column)]
+        if not self._guess_bits >> (row * 10 + column) & 1:
+            self._atoms_left += -1
+        self._apply_atom(atom, -1)
+        return True
 
     def add_atom(self, row, column):
         """
@@ -270,19 +494,58 @@ class BlackBoxGame:
         returns None and 1 point is deducted. If a reflection occurs, returns the exit point and 1 point deducts.
         If a deflection or a miss occurs, returns the exit point and 2 points are deducted.
         """
-        if self._black_box[row][column] == '':              # if no ray has been shot from the entry point
-            ray = Ray(row, column, self._black_box)         # ray object is created
-            self._score += ray.get_ray_score()              # the score is adjusted based on the outcome
+        value = self._black_box[row][column]
+        if self._event_log is not None:
+            self._event_log.shot(self._log_id, row, column)
+        if value == '':                                     # if no ray has been shot from the entry point
+            ray = self.trace_ray(row, column)               # ray object is created (or reused from the cache)
             result = ray.get_ray_result()                   # the result (exit point or none) is created
+            self._score += self._scoring.ray_score((row, column), result)  # score is adjusted based on the outcome
             if result is None:                              # if there is not an exit point
-                self._black_box[row][column] = 'H'          # the entry point is marked a hit
+                self._mark(row, column, 'H')                # the entry point is marked a hit
             elif result == (row, column):                   # if the exit point is the same as the entry
-                self._black_box[row][column] = 'R'          # the entry point is marked a reflection
+                self._mark(row, column, 'R')                # the entry point is marked a reflection
             else:                                           # if the exit point is not the entry point
-                self._black_box[row][column] = 'D'          # the entry point is marked as a deflection
-                self._black_box[result[0]][result[1]] = 'D' # also marks the exit point (entry/exit is reversible)
+                self._mark(row, column, 'D')                # the entry point is marked as a deflection
+                self._mark(result[0], result[1], 'D')       # also marks the exit point (entry/exit is reversible)
             return result
 
+    def can_shoot(self, row, column):
+        """
+        :param row and column: a position on the board
+        :return: True if a ray can be shot from the position: a border position that is not a corner and that no
+        earlier ray entered or exited from. shoot_ray does nothing and returns None for any other position.
+        """
+        return 0 <= row <= 9 and 0 <= column <= 9 and self._black_box[row][column] == ''
+
+    def _mark(self, row, column, letter):
+        """
+        :param row and column: a border position
+        :param letter: 'H', 'R', 'D', or '' to clear the mark
+        :return: none
+        Marks the border position on the board and in the bitboard of marks.
+        """
+        self._black_box[row][column] = letter
+        shift = 2 * (row * 10 + column)
+        self._marks = self._marks & ~(3 << shift) | _MARKS[letter] << shift
+
+    def trace_ray(self, row, column):
+        """
+        :param row
+        :param column: the border row and column from which the ray enters the black box
+        :return: the Ray object traced from the entry point
+        Traces a ray without scoring it or marking the board. Traced rays are cached until an atom placed or removed
+        changes a position the ray stepped into.
+        """
+        ray = self._ray_cache.get((row, column))
+        if ray is None:
+            ray = Ray(row, column, self._black_box)
+            self._ray_cache[(row, column)] = ray
+            if not self._shared_rays:                       # a shared cache is dropped whole on any atom change
+                for position in ray.get_ray_path():
+                    self._cell_rays.setdefault(position, set()).add((row, column))
+        return ray
+
     def guess_atom(self, row, column):
         """
         :param row:
@@ -291,14 +554,26 @@ class BlackBoxGame:
         Takes as parameters a row and column (in that order).
         If there is an atom with that position is in the list of atoms, returns True, otherwise returns False.
         The guessing player's score will be adjusted down 5 points for an incorrect guess
-        """
-        if (row, column) not in self._atom_guesses:         # if the position has not already been guessed
-            self._atom_guesses.append((row, column))        # add the position to the list of guesses
-            if (row, column) in self._atom_positions:       # if the position is that of an atom
+        Guesses are looked up in the bitboards of atoms and guesses, so a guess takes constant time. Positions outside
+        the 10x10 board have no bit and are kept in a set; guessing one is incorrect the first time.
+        """
+        if self._event_log is not None:
+            self._event_log.guess(self._log_id, row, column)
+        if not (0 <= row < 10 and 0 <= column < 10):        # a position off the board is never an atom
+            if (row, column) not in self._off_board_guesses:
+                self._off_board_guesses.add((row, column))
+                self._score += self._scoring.guess_score(False)
+                return False
+            return None
+        bit = 1 << (row * 10 + column)
+        if not self._guess_bits & bit:                      # if the position has not already been guessed
+            self._guess_bits |= bit                         # add the position to the guesses
+            if self._atom_bits & bit:                       # if the position is that of an atom
                 self._atoms_left += -1                      # remove one from the # of atoms remaining
+                self._score += self._scoring.guess_score(True)
                 return True
             else:
-                self._score += -5                           # subtract 5 for wrong guess
+                self._score += self._scoring.guess_score(False)    # subtract 5 for wrong guess
                 return False
 
     def atoms_left(self):
@@ -308,3 +583,139 @@ class BlackBoxGame:
         A method that takes no parameters and returns the number of atoms that haven't been guessed yet.
         """
         return self._atoms_left
+
+    def snapshot(self):
+        """
+        :param: none
+        :return: the state of the game as a tuple of 4 integers: the bitboard of atoms, the bitboard of guesses,
+        the marks of the border positions (2 bits per position: 0 none, 1 'H', 2 'R', 3 'D') and the packed score
+        (the score offset by 2**15 in the high 16 bits and the number of atoms left in the low 8 bits).
+        Raises ValueError if the score is not in -2**15 to 2**15 - 1 or the atoms left are not in 0 to 255, which do
+        not fit in those bits. Guesses of positions off the board are not part of the snapshot.
+        A logged game records the snapshot, so that a replay can restore its own state at this point.
+        """
+        if not (-_SCORE_OFFSET <= self._score < _SCORE_OFFSET and 0 <= self._atoms_left <= 0xFF):
+            raise ValueError('score %d or atoms left %d out of the range of a snapshot'
+                             % (self._score, self._atoms_left))
+        packed = (self._score + _SCORE_OFFSET) << 8 | self._atoms_left
+        snapshot = self._atom_bits, self._guess_bits, self._marks, packed
+        if self._event_log is not None:
+            self._event_log.snapshot(self._log_id, snapshot)
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        :param snapshot: a tuple returned by snapshot, possibly of another game
+        :return: none
+        Returns the game to the state of the snapshot. Only the atoms and border marks that differ from the current
+        state are changed, atoms being placed and removed incrementally. Guesses of positions off the board are kept.
+        Raises ValueError, before changing the game, if the snapshot has atoms outside the black box, marks of
+        positions that are not border entries, guesses off the 10x10 board or a packed score of more than 24 bits.
+        """
+        atom_bits, guess_bits, marks, packed = snapshot
+        if (atom_bits & ~_CELL_MASK or marks & ~_ENTRY_MASK or not 0 <= guess_bits < 1 << 100 or
+                not 0 <= packed < 1 << 24):
+            raise ValueError('not a snapshot of a BlackBoxGame')
+        if self._event_log is not None:
+            self._event_log.restore(self._log_id, snapshot)
+        self._set_state((atom_bits, guess_bits, marks, (packed >> 8) - _SCORE_OFFSET, packed & 0xFF))
+
+    def _state(self):
+        """
+        :return: the state of the game as a tuple of the bitboards of atoms, guesses and marks, the score and the
+        atoms left, like a snapshot but with the score and atoms left unpacked, so of any size or type
+        """
+        return self._atom_bits, self._guess_bits, self._marks, self._score, self._atoms_left
+
+    def _set_state(self, state):
+        """
+        :param state: a tuple returned by _state
+        :return: none
+        Returns the game to the state as restore does, without checking or logging it.
+        """
+        atom_bits, guess_bits, marks, score, atoms_left = state
+        changed = self._atom_bits ^ atom_bits
+        while changed:
+            bit = changed & -changed                        # lowest changed position
+            row, column = divmod(bit.bit_length() - 1, 10)
+            if atom_bits & bit:
+                atom = Atom(row, column)
+                self._atoms[(row, column)] = [atom]
+                self._apply_atom(atom, 1)
+            else:
+                for atom in self._atoms.pop((row, column)):    # positions listed more than once hold several atoms
+                    self._apply_atom(atom, -1)
+            changed ^= bit
+        changed = self._marks ^ marks
+        while changed:
+            shift = ((changed & -changed).bit_length() - 1) & ~1   # lowest changed 2-bit mark
+            row, column = divmod(shift // 2, 10)
+            self._mark(row, column, _MARK_LETTERS[marks >> shift & 3])
+            changed &= ~(3 << shift)
+        self._guess_bits = guess_bits
+        self._score = score
+        self._atoms_left = atoms_left
+
+    def get_log_id(self):
+        """
+        :return: the id of the game in its event log, or None if the game is not logged
+        """
+        return self._log_id
+
+    @staticmethod
+    def pack(snapshot):
+        """
+        :param snapshot: a tuple returned by snapshot
+        :return: the snapshot as SNAPSHOT_SIZE bytes, all little-endian: 1 bit per position of CELLS for the atoms,
+        the 100-bit bitboard of guesses, 2 bits per position of ENTRIES for the marks and the packed score
+        """
+        atom_bits, guess_bits, marks, packed = snapshot
+        atoms = 0
+        for index, bit in enumerate(_CELL_BITS):
+            if atom_bits & bit:
+                atoms |= 1 << index
+        entry_marks = 0
+        for index, shift in enumerate(_ENTRY_SHIFTS):
+            entry_marks |= (marks >> shift & 3) << 2 * index
+        return (atoms.to_bytes(8, 'little') + guess_bits.to_bytes(13, 'little') + entry_marks.to_bytes(8, 'little') +
+                packed.to_bytes(3, 'little'))
+
+    @staticmethod
+    def unpack(data):
+        """
+        :param data: SNAPSHOT_SIZE bytes returned by pack
+        :return: the snapshot tuple
+        Raises ValueError if data is not SNAPSHOT_SIZE bytes or has guesses off the 10x10 board.
+        """
+        if len(data) != SNAPSHOT_SIZE:
+            raise ValueError('a packed snapshot is %d bytes, not %d' % (SNAPSHOT_SIZE, len(data)))
+        atoms = int.from_bytes(data[0:8], 'little')
+        guess_bits = int.from_bytes(data[8:21], 'little')
+        entry_marks = int.from_bytes(data[21:29], 'little')
+        if guess_bits >> 100:
+            raise ValueError('packed snapshot has guesses off the board')
+        atom_bits = 0
+        for index, bit in enumerate(_CELL_BITS):
+            if atoms >> index & 1:
+                atom_bits |= bit
+        marks = 0
+        for index, shift in enumerate(_ENTRY_SHIFTS):
+            marks |= (entry_marks >> 2 * index & 3) << shift
+        return atom_bits, guess_bits, marks, int.from_bytes(data[29:32], 'little')
+
+    def to_bytes(self):
+        """
+        :return: the state of the game as SNAPSHOT_SIZE bytes
+        """
+        return self.pack(self.snapshot())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        :param data: bytes returned by to_bytes
+        :return: a new game in the state the bytes represent
+        Raises ValueError if data is not a packed snapshot.
+        """
+        game = cls([])
+        game.restore(cls.unpack(data))
+        return game
@@ -0,0 +1,478 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: A solver that infers the atoms of a BlackBoxGame from the results of rays that have been shot. Given a
+# set of observations (entry point -> exit point, or None for a hit) and the number of atoms, the solver counts and
+# enumerates the atom placements on the 8x8 black box that are consistent with every observation, computes the
+# probability of each position holding an atom, and suggests the next most informative ray to shoot.
+# The search follows each observed ray through the black box and only decides (atom or empty) the positions a ray
+# needs in order to move on. A partial board is abandoned as soon as a ray that can be followed to its end disagrees
+# with its observation, and the atom count decides the remaining positions once all atoms are placed or every
+# remaining position is needed (constraint propagation). Once every ray is resolved the undecided positions can no
+# longer change any observation, so the placements of the remaining atoms are counted without being searched.
+# Partial boards are memoized in a transposition table shared by every query, and independent subtrees can be fanned
+# out to a process pool.
+
+from concurrent.futures import ProcessPoolExecutor
+from math import comb, log2
+import itertools
+import random
+
+from BlackBoxGame import CELLS, ENTRIES
+
+DOWN, UP, RIGHT, LEFT = 0, 1, 2, 3
+_STEP = (10, -10, 1, -1)                    # change of a 10x10 board position (row * 10 + column) per direction
+_TURNS = ({None: DOWN, 0: UP, 1: RIGHT, 2: LEFT, 3: UP, 4: UP},             # the same turns as Ray.down/up/right/left
+          {None: UP, 0: DOWN, 1: DOWN, 2: DOWN, 3: LEFT, 4: RIGHT},
+          {None: RIGHT, 0: LEFT, 1: LEFT, 2: UP, 3: DOWN, 4: LEFT},
+          {None: LEFT, 0: RIGHT, 1: UP, 2: RIGHT, 3: RIGHT, 4: DOWN})
+
+_INDEX = [-1] * 100                         # board position -> index of the cell (-1 on the border)
+for _i, (_row, _column) in enumerate(CELLS):
+    _INDEX[_row * 10 + _column] = _i
+
+# an atom at (row, column) deflects into the cell at (row - 1, column + 1) from quadrant 1, (row - 1, column - 1)
+# from quadrant 2, (row + 1, column - 1) from quadrant 3 and (row + 1, column + 1) from quadrant 4
+_SOURCES = []                               # cell -> list of (quadrant, bit of the atom deflecting into the cell)
+for _row, _column in CELLS:
+    _sources = []
+    for _quadrant, (_dr, _dc) in ((1, (1, -1)), (2, (1, 1)), (3, (-1, 1)), (4, (-1, -1))):
+        _source = _INDEX[(_row + _dr) * 10 + _column + _dc]
+        if _source >= 0:
+            _sources.append((_quadrant, 1 << _source))
+    _SOURCES.append(_sources)
+
+_MASKS = [sum(bit for _, bit in sources) for sources in _SOURCES]    # cell -> bitboard of atoms deflecting into it
+_ALL = (1 << 64) - 1
+
+
+def _value(i, atoms):
+    """
+    :param i: the index of a cell inside the black box
+    :param atoms: bitboard of the atoms
+    :return: the board value of the cell in the same encoding as BlackBoxGame (True for an atom)
+    """
+    if atoms >> i & 1:
+        return True
+    count, quadrant = 0, None
+    for source_quadrant, bit in _SOURCES[i]:
+        if atoms & bit:
+            count += 1
+            quadrant = source_quadrant
+    if count > 1:                                           # double deflection - reflection
+        return 0
+    return quadrant
+
+
+def _advance(position, direction, atoms, decided):
+    """
+    Moves a ray that is about to step into position as far as the decided cells allow.
+    :param position: the board position the ray steps into next
+    :param direction: the direction the ray is moving in
+    :param atoms: bitboard of the atoms
+    :param decided: bitboard of the cells known to hold an atom or known to be empty
+    :return: (True, result) if the ray's result is known, where result is the exit point or None for a hit, otherwise
+    (False, (position, direction, cell)) where cell is the index of an undecided cell needed to move the ray on
+    """
+    while True:
+        i = _INDEX[position]
+        if i < 0:                                           # the ray reaches an edge/exit point
+            return True, (position // 10, position % 10)
+        if not decided >> i & 1:                            # not known whether the cell holds an atom
+            return False, (position, direction, i)
+        if atoms >> i & 1:                                  # hit
+            return True, None
+        unknown = _MASKS[i] & ~decided
+        if unknown:                                         # not known which atoms deflect into the cell
+            return False, (position, direction, unknown.bit_length() - 1)
+        direction = _TURNS[direction][_value(i, atoms)]
+        position += _STEP[direction]
+
+
+def trace(atoms, row, column):
+    """
+    :param atoms: an iterable of (row, column) atom positions
+    :param row
+    :param column: the border row and column from which the ray enters the black box
+    :return: the exit point of the ray, None for a hit, or False if the entry point is not a border position;
+    the same result as BlackBoxGame.shoot_ray would return for the entry point
+    """
+    if (row, column) not in ENTRIES:
+        return False
+    bits = 0
+    for atom_row, atom_column in atoms:
+        bits |= 1 << _INDEX[atom_row * 10 + atom_column]
+    direction = _entry_direction(row, column)
+    return _advance(row * 10 + column + _STEP[direction], direction, bits, _ALL)[1]
+
+
+def _entry_direction(row, column):
+    """
+    :return: the direction a ray moves in when it enters from the given border position
+    """
+    if row == 0:
+        return DOWN
+    elif row == 9:
+        return UP
+    elif column == 0:
+        return RIGHT
+    else:
+        return LEFT
+
+
+class AtomSolverException(Exception):
+    """
+    Raised when the solver is given observations or known positions that are not valid
+    """
+    pass
+
+
+class AtomSolver:
+    """
+    Represents the atom placements of a BlackBoxGame that are consistent with a set of ray observations.
+    Contains methods to count and enumerate the consistent placements, to compute the probability of each position
+    holding an atom, to draw random consistent placements and to suggest the next ray to shoot and the atoms to guess.
+    Every consistent placement is considered equally likely.
+    """
+
+    def __init__(self, observations, atom_count, known_atoms=(), known_empty=()):
+        """
+        :param observations: a dict of border entry points to the result of shooting a ray from them; the exit point
+        as a tuple or None for a hit, as returned by BlackBoxGame.shoot_ray
+        :param atom_count: the number of atoms in the black box
+        :param known_atoms: positions known to hold an atom (for example correct guesses)
+        :param known_empty: positions known not to hold an atom (for example wrong guesses)
+        """
+        if not 0 <= atom_count <= 64:
+            raise AtomSolverException('atom_count must be between 0 and 64')
+        self._observations = dict(observations)
+        self._atom_count = atom_count
+        self._targets = []                                  # observation index -> observed result
+        self._starts = []                                   # observation index -> (first position, direction)
+        for entry, result in self._observations.items():
+            if entry not in ENTRIES:
+                raise AtomSolverException('%s is not a border entry point' % (entry,))
+            direction = _entry_direction(entry[0], entry[1])
+            self._targets.append(None if result is None else tuple(result))
+            self._starts.append((entry[0] * 10 + entry[1] + _STEP[direction], direction))
+        self._known_atoms = 0                               # bitboard of positions known to hold an atom
+        self._known_empty = 0                               # bitboard of positions known to be empty
+        for cells, value in ((known_atoms, True), (known_empty, False)):
+            for cell in cells:
+                if tuple(cell) not in CELLS:
+                    raise AtomSolverException('%s is not a position in the black box' % (cell,))
+                bit = 1 << CELLS.index(tuple(cell))
+                if value:
+                    self._known_atoms |= bit
+                else:
+                    self._known_empty |= bit
+        if self._known_atoms & self._known_empty:
+            raise AtomSolverException('a position is both a known atom and known to be empty')
+        self._table = {}                                    # transposition table: (atoms, decided) -> (count, weights)
+
+    def __getstate__(self):
+        """
+        Sends the solver to worker processes without its transposition table
+        """
+        state = self.__dict__.copy()
+        state['_table'] = {}
+        return state
+
+    def _root(self):
+        """
+        :return: the search node before any cell is decided, or None if the observations contradict each other
+        A node is a tuple of (bitboard of atoms, bitboard of decided cells, rays not resolved yet), where each ray is
+        a tuple of (observation index, position, direction, index of the undecided cell needed to move it on).
+        """
+        rays = tuple((index, position, direction, None) for index, (position, direction) in enumerate(self._starts))
+        return self._propagate(self._known_atoms, self._known_atoms | self._known_empty, rays)
+
+    def _propagate(self, atoms, decided, rays):
+        """
+        Follows each ray that is not resolved yet through the decided cells. Once every atom has been placed the
+        remaining cells are decided as empty, and once the remaining cells are needed for the remaining atoms they are
+        decided as atoms.
+        :return: the node with the remaining rays, or None if a resolved ray disagrees with its observation or there
+        are not enough or too many atoms left
+        """
+        need = self._atom_count - bin(atoms).count('1')
+        undecided = _ALL & ~decided
+        room = bin(undecided).count('1')
+        if need < 0 or need > room:
+            return None
+        if need == 0:                                       # every other cell is empty
+            decided = _ALL
+        elif need == room:                                  # every other cell holds an atom
+            atoms |= undecided
+            decided = _ALL
+        remaining = []
+        for index, position, direction, _ in rays:
+            done, value = _advance(position, direction, atoms, decided)
+            if done:
+                if value != self._targets[index]:           # the ray contradicts its observation
+                    return None
+            else:
+                remaining.append((index,) + value)
+        return atoms, decided, tuple(remaining)
+
+    def _expand(self, node):
+        """
+        :return: a list of the child nodes for the two ways of deciding the cell needed by the first unresolved ray,
+        leaving out decisions that contradict an observation
+        """
+        atoms, decided, rays = node
+        bit = 1 << rays[0][3]
+        children = (self._propagate(atoms | bit, decided | bit, rays), self._propagate(atoms, decided | bit, rays))
+        return [child for child in children if child is not None]
+
+    def _children(self, node):
+        """
+        :return: a list of (child node, count) for the child nodes with at least one consistent placement
+        """
+        children = []
+        for child in self._expand(node):
+            count = self._solve(child)[0]
+            if count:
+                children.append((child, count))
+        return children
+
+    def _leaf(self, node):
+        """
+        :return: (count, weights) for a node whose rays are all resolved; the undecided cells can no longer change any
+        observation so every way of placing the remaining atoms in them is consistent
+        """
+        atoms, decided, rays = node
+        need = self._atom_count - bin(atoms).count('1')
+        room = 64 - bin(decided).count('1')
+        count = comb(room, need)
+        share = comb(room - 1, need - 1) if need > 0 else 0
+        weights = tuple(count if atoms >> i & 1 else 0 if decided >> i & 1 else share for i in range(64))
+        return count, weights
+
+    def _solve(self, node):
+        """
+        :param node: a search node
+        :return: (count, weights); the number of consistent placements below the node and, for every cell, the number
+        of those placements with an atom in the cell
+        """
+        atoms, decided, rays = node
+        if not rays:
+            return self._leaf(node)
+        found = self._table.get((atoms, decided))
+        if found is not None:
+            return found
+        count, weights = 0, (0,) * 64
+        for child, child_count in self._children(node):
+            count += child_count
+            weights = tuple(map(int.__add__, weights, self._solve(child)[1]))
+        self._table[(atoms, decided)] = (count, weights)
+        return count, weights
+
+    def _split(self, parts):
+        """
+        :return: a list of independent search nodes covering the whole search, at least parts long if possible
+        """
+        root = self._root()
+        nodes = [] if root is None else [root]
+        while 0 < len(nodes) < parts and any(node[2] for node in nodes):
+            expanded = []
+            for node in nodes:
+                if node[2]:
+                    expanded.extend(self._expand(node))
+                else:
+                    expanded.append(node)
+            nodes = expanded
+        return nodes
+
+    def _totals(self, processes=None):
+        """
+        :param processes: the number of worker processes to fan subtrees out to; solves in process if None or 1
+        :return: (count, weights) for the whole search
+        """
+        if processes is None or processes <= 1:
+            root = self._root()
+            return (0, (0,) * 64) if root is None else self._solve(root)
+        nodes = self._split(4 * processes)
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_solve_subtree, [self] * len(nodes), nodes))
+        count, weights = 0, (0,) * 64
+        for node, result in zip(nodes, results):
+            self._table[node[:2]] = result                  # later queries reuse the subtrees solved by the workers
+            count += result[0]
+            weights = tuple(map(int.__add__, weights, result[1]))
+        return count, weights
+
+    def count(self, processes=None):
+        """
+        :param processes: the number of worker processes to use (optional)
+        :return: the number of atom placements consistent with every observation
+        """
+        return self._totals(processes)[0]
+
+    def probabilities(self, processes=None):
+        """
+        :param processes: the number of worker processes to use (optional)
+        :return: a dict of every position in the black box to the probability that it holds an atom, or an empty dict
+        if no placement is consistent with the observations
+        """
+        count, weights = self._totals(processes)
+        if count == 0:
+            return {}
+        return {cell: weights[i] / count for i, cell in enumerate(CELLS)}
+
+    def solutions(self, limit=None):
+        """
+        :param limit: the maximum number of placements to yield (optional)
+        :return: a generator of the consistent placements, each a list of (row, column) atom positions
+        """
+        root = self._root()
+        if root is None:
+            return
+        for atoms in itertools.islice(self._enumerate(root), limit):
+            yield [cell for i, cell in enumerate(CELLS) if atoms >> i & 1]
+
+    def _enumerate(self, node):
+        """
+        :return: a generator of the bitboards of the consistent placements below the node
+        """
+        atoms, decided, rays = node
+        if not rays:
+            undecided = [1 << i for i in range(64) if not decided >> i & 1]
+            for bits in itertools.combinations(undecided, self._atom_count - bin(atoms).count('1')):
+                yield atoms | sum(bits)
+            return
+        for child, _ in self._children(node):               # subtrees without a consistent placement are skipped
+            yield from self._enumerate(child)
+
+    def sample(self, samples, seed=None):
+        """
+        :param samples: the number of placements to draw
+        :param seed: seed for the random number generator (optional)
+        :return: a list of placements drawn uniformly at random from the consistent placements (with replacement),
+        each a list of (row, column) atom positions; empty if no placement is consistent
+        """
+        rng = random.Random(seed)
+        root = self._root()
+        if root is None or self._solve(root)[0] == 0:
+            return []
+        drawn = []
+        for _ in range(samples):
+            atoms = self._draw(root, rng)
+            drawn.append([cell for i, cell in enumerate(CELLS) if atoms >> i & 1])
+        return drawn
+
+    def _draw(self, node, rng):
+        """
+        :return: the bitboard of a placement below the node drawn uniformly at random
+        """
+        while node[2]:
+            children = self._children(node)
+            node = children[_pick(rng, [count for _, count in children])][0]
+        atoms, decided, rays = node
+        undecided = [1 << i for i in range(64) if not decided >> i & 1]
+        return atoms | sum(rng.sample(undecided, self._atom_count - bin(atoms).count('1')))
+
+    def rank_shots(self, samples=256, seed=None):
+        """
+        :param samples: the number of consistent placements to estimate the results of each ray from
+        :param seed: seed for the random number generator (optional)
+        :return: a list of (entry point, information in bits, expected cost) for every entry point that has not been
+        used yet, most informative first. The information is the entropy of the ray's result over the consistent
+        placements and the expected cost is the expected score change under BlackBoxGame's scoring (-1 for a hit or a
+        reflection, -2 otherwise). Ties are broken by the cheaper expected cost.
+        """
+        used = set(self._observations)
+        used.update(result for result in self._observations.values() if result is not None)
+        boards = self.sample(samples, seed)
+        ranked = []
+        for entry in ENTRIES:
+            if entry in used or not boards:
+                continue
+            results = {}
+            cost = 0
+            for board in boards:
+                result = trace(board, entry[0], entry[1])
+                results[result] = results.get(result, 0) + 1
+                cost += -1 if result is None or result == entry else -2
+            entropy = sum(n / len(boards) * log2(len(boards) / n) for n in results.values())
+            ranked.append((entry, entropy, cost / len(boards)))
+        ranked.sort(key=lambda shot: (-shot[1], -shot[2]))
+        return ranked
+
+    def suggest_shot(self, samples=256, seed=None):
+        """
+        :return: the entry point of the most informative ray to shoot next, or None if every entry point has been used
+        or no placement is consistent with the observations
+        """
+        ranked = self.rank_shots(samples, seed)
+        return ranked[0][0] if ranked else None
+
+    def suggest_guesses(self, limit=None, processes=None):
+        """
+        :param limit: the maximum number of guesses to return (optional)
+        :param processes: the number of worker processes to use (optional)
+        :return: a list of (position, probability, expected score change) ordered from the most to the least likely
+        atom, excluding known positions. A wrong guess costs 5 points in BlackBoxGame, so the expected score change of
+        guessing a position is -5 times the probability that it does not hold an atom.
+        """
+        guesses = [(cell, probability, 5 * (probability - 1))
+                   for cell, probability in self.probabilities(processes).items()
+                   if not (self._known_atoms | self._known_empty) >> CELLS.index(cell) & 1]
+        guesses.sort(key=lambda guess: -guess[1])
+        return guesses[:limit]
+
+
+def _solve_subtree(solver, node):
+    """
+    Solves one subtree of the search in a worker process
+    """
+    return solver._solve(node)
+
+
+def _pick(rng, counts):
+    """
+    :return: an index into counts drawn with probability proportional to its count
+    """
+    point = rng.randrange(sum(counts))
+    for index, count in enumerate(counts):
+        if point < count:
+            return index
+        point -= count
+
+
+# BASIC TESTING
+if __name__ == '__main__':
+    import time
+    from BlackBoxGame import BlackBoxGame
+
+    print("\nSolve time benchmark")
+    print("--------------------")
+    rng = random.Random(261)
+    for atom_count in range(4, 9):
+        for shots in (8, 16, 32):
+            times = []
+            counts = []
+            for _ in range(5):
+                atoms = rng.sample(CELLS, atom_count)
+                game = BlackBoxGame(atoms)
+                observations = {}
+                for entry in rng.sample(ENTRIES, shots):
+                    observations[entry] = game.trace_ray(entry[0], entry[1]).get_ray_result()
+                start = time.perf_counter()
+                solver = AtomSolver(observations, atom_count)
+                counts.append(solver.count())
+                times.append(time.perf_counter() - start)
+            print(atom_count, 'atoms', shots, 'shots:', 'mean %.3fs' % (sum(times) / len(times)),
+                  'max %.3fs' % max(times), 'placements', counts)
+
+    print("\nSolver example")
+    print("--------------")
+    atoms = [(3, 2), (3, 7), (6, 4), (8, 7)]
+    game = BlackBoxGame(atoms)
+    observations = {}
+    for entry in ENTRIES[::8]:
+        observations[entry] = game.trace_ray(entry[0], entry[1]).get_ray_result()
+    solver = AtomSolver(observations, len(atoms))
+    print(solver.count(), solver.count(processes=2))
+    print(solver.suggest_shot(seed=1))
+    print(solver.suggest_guesses(limit=4))
+    print(list(solver.solutions(limit=3)))
@@ -0,0 +1,239 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: A batch simulator that plays large numbers of random BlackBoxGame games at once to evaluate guessing
+# strategies. Instead of Atom, Ray and BlackBoxGame objects, a batch of games is represented by NumPy arrays of shape
+# (games, rows, columns) and the rays from all 32 border positions of every board in the batch are traced together,
+# one step per iteration. Batches are spread over a process pool and the scores of all games are reported as an
+# aggregate score distribution. Scoring follows BlackBoxGame: 25 points to start, -1 for a hit or a reflection, -2 for
+# a deflection or a miss, nothing for a ray shot from an already marked border position and -5 for a wrong guess.
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from BlackBoxGame import CELLS, ENTRIES
+
+ROWS = COLUMNS = 10
+
+HIT = -1                                    # exit position of a ray that hits an atom
+NOT_FIRED = -2                              # exit position of a shot from an already marked border position
+
+# board values: the same deflection quadrants 1-4 as BlackBoxGame, with separate codes for reflections, atoms and
+# border positions
+EMPTY, REFLECTION, ATOM, BORDER = 0, 5, 6, 7
+DOWN, UP, RIGHT, LEFT = 0, 1, 2, 3
+_STEP = np.array([COLUMNS, -COLUMNS, 1, -1], dtype=np.int16)
+# _TURNS[direction, value] is the direction a ray moves in after stepping into a cell, as in Ray.down/up/right/left
+_TURNS = np.array([[DOWN, RIGHT, LEFT, UP, UP, UP, DOWN, DOWN],
+                   [UP, DOWN, DOWN, LEFT, RIGHT, DOWN, UP, UP],
+                   [RIGHT, LEFT, UP, DOWN, LEFT, LEFT, RIGHT, RIGHT],
+                   [LEFT, UP, RIGHT, RIGHT, DOWN, RIGHT, LEFT, LEFT]], dtype=np.int8)
+
+_INTERIOR = np.array([row * COLUMNS + column for row, column in CELLS], dtype=np.int16)
+_ENTRY_POSITIONS = np.array([row * COLUMNS + column for row, column in ENTRIES], dtype=np.int16)
+_ENTRY_DIRECTIONS = np.array([DOWN] * 8 + [UP] * 8 + [RIGHT] * 8 + [LEFT] * 8, dtype=np.int8)
+
+
+def random_layouts(games, atoms, rng):
+    """
+    :param games: the number of boards to generate
+    :param atoms: the number of atoms on each board
+    :param rng: a numpy.random.Generator
+    :return: a bool array of shape (games, 10, 10) that is True at the positions of the atoms; every board has the
+    given number of atoms at distinct positions inside the black box, chosen uniformly at random
+    """
+    chosen = rng.random((games, 64)).argpartition(atoms - 1, axis=1)[:, :atoms] if atoms else np.empty((games, 0), int)
+    layouts = np.zeros((games, ROWS * COLUMNS), dtype=bool)
+    np.put_along_axis(layouts, _INTERIOR[chosen], True, axis=1)
+    return layouts.reshape(games, ROWS, COLUMNS)
+
+
+def board_values(layouts):
+    """
+    :param layouts: a bool array of shape (games, 10, 10) of atom positions
+    :return: an int8 array of shape (games, 10, 10) of board values; the quadrant (1-4) of a single deflection,
+    REFLECTION where deflections overlap, ATOM, BORDER or EMPTY, as BlackBoxGame.update_board would place them
+    """
+    atoms = layouts.astype(np.int8)
+    quadrants = np.zeros((4,) + atoms.shape, dtype=np.int8)
+    quadrants[0][:, :-1, 1:] = atoms[:, 1:, :-1]    # quadrant 1: the atom is one row down and one column left
+    quadrants[1][:, :-1, :-1] = atoms[:, 1:, 1:]    # quadrant 2: the atom is one row down and one column right
+    quadrants[2][:, 1:, :-1] = atoms[:, :-1, 1:]    # quadrant 3: the atom is one row up and one column right
+    quadrants[3][:, 1:, 1:] = atoms[:, :-1, :-1]    # quadrant 4: the atom is one row up and one column left
+    count = quadrants.sum(axis=0)
+    single = quadrants[0] + 2 * quadrants[1] + 3 * quadrants[2] + 4 * quadrants[3]
+    values = np.where(count > 1, REFLECTION, np.where(count == 1, single, EMPTY)).astype(np.int8)
+    values[layouts] = ATOM
+    values[:, [0, -1], :] = BORDER
+    values[:, :, [0, -1]] = BORDER
+    return values
+
+
+def trace_rays(values):
+    """
+    :param values: an int8 array of shape (games, 10, 10) of board values
+    :return: an int16 array of shape (games, 32) of the exit position (row * 10 + column) of the ray from each border
+    position in ENTRIES, or HIT if the ray hits an atom
+    """
+    games = values.shape[0]
+    flat = values.reshape(games, ROWS * COLUMNS)
+    exits = np.full((games, len(ENTRIES)), HIT, dtype=np.int16)
+    game = np.repeat(np.arange(games), len(ENTRIES))                # every ray still moving, as flat arrays
+    ray = np.tile(np.arange(len(ENTRIES)), games)
+    position = np.tile(_ENTRY_POSITIONS, games)
+    direction = np.tile(_ENTRY_DIRECTIONS, games)
+    while game.size:
+        position = position + _STEP[direction]                      # every ray steps into its next cell
+        value = flat[game, position]
+        done = (value == BORDER) | (value == ATOM)
+        exits[game[value == BORDER], ray[value == BORDER]] = position[value == BORDER]
+        moving = ~done
+        game, ray, position = game[moving], ray[moving], position[moving]
+        direction = _TURNS[direction[moving], value[moving]]
+    return exits
+
+
+def play(layouts, exits, shots=None, guesser=None):
+    """
+    Scores a batch of games in which the rays in shots are shot in order and then the guesser's guesses are made.
+    :param layouts: a bool array of shape (games, 10, 10) of atom positions
+    :param exits: the ray results of the boards, as returned by trace_rays
+    :param shots: indexes into ENTRIES of the border positions to shoot from, in order (all 32 by default)
+    :param guesser: a function taking an int16 array of shape (games, len(shots)) of the exit positions of the shots
+    (HIT for a hit, NOT_FIRED for a shot from a marked border position) and returning a bool array of shape
+    (games, 10, 10) of guessed atom positions (optional; no guesses are made if None). For a process pool it must be
+    picklable, such as a module level function.
+    :return: (scores, atoms left) as int arrays of shape (games,)
+    """
+    games = layouts.shape[0]
+    shots = range(len(ENTRIES)) if shots is None else shots
+    scores = np.full(games, 25, dtype=np.int32)
+    marked = np.zeros((games, ROWS * COLUMNS + 1), dtype=bool)      # marked border positions (+1 slot for hits)
+    results = np.empty((games, len(shots)), dtype=np.int16)
+    rows = np.arange(games)
+    for column, shot in enumerate(shots):
+        entry = _ENTRY_POSITIONS[shot]
+        exit_position = exits[:, shot]
+        fired = ~marked[:, entry]
+        cost = np.where((exit_position == HIT) | (exit_position == entry), 1, 2)
+        scores -= np.where(fired, cost, 0)
+        marked[:, entry] = True
+        marked[rows[fired], np.where(exit_position[fired] == HIT, ROWS * COLUMNS, exit_position[fired])] = True
+        results[:, column] = np.where(fired, exit_position, NOT_FIRED)
+    atoms_left = layouts.reshape(games, -1).sum(axis=1)
+    if guesser is not None:
+        guesses = np.asarray(guesser(results), dtype=bool)
+        correct = (guesses & layouts).reshape(games, -1).sum(axis=1)
+        wrong = (guesses & ~layouts).reshape(games, -1).sum(axis=1)
+        scores -= 5 * wrong
+        atoms_left -= correct
+    return scores, atoms_left
+
+
+def _simulate_batch(games, atoms, shots, guesser, seed):
+    """
+    Plays one batch of random games
+    :return: a histogram of the scores as (lowest score, counts per score from the lowest score up)
+    """
+    rng = np.random.default_rng(seed)
+    layouts = random_layouts(games, atoms, rng)
+    scores, _ = play(layouts, trace_rays(board_values(layouts)), shots, guesser)
+    lowest = int(scores.min())
+    return lowest, np.bincount(scores - lowest)
+
+
+def simulate(games, atoms, shots=None, guesser=None, batch_size=100000, processes=None, seed=None):
+    """
+    Plays random games in batches and reports the distribution of their scores.
+    :param games: the number of games to play
+    :param atoms: the number of atoms in each game
+    :param shots: indexes into ENTRIES of the border positions to shoot from, in order (all 32 by default)
+    :param guesser: a function making guesses from the results of the shots (see play)
+    :param batch_size: the number of games traced together in one batch
+    :param processes: the number of worker processes to spread batches over; runs in process if None or 1
+    :param seed: seed for the random layouts (optional)
+    :return: a dict of the number of games, the mean, standard deviation, minimum, maximum and percentiles (5, 25, 50,
+    75, 95) of the scores, and a histogram dict of score -> number of games
+    """
+    sizes = [batch_size] * (games // batch_size) + ([games % batch_size] if games % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [sizes, [atoms] * len(sizes), [shots] * len(sizes), [guesser] * len(sizes), seeds]
+    if processes is None or processes <= 1:
+        batches = list(map(_simulate_batch, *arguments))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            batches = list(pool.map(_simulate_batch, *arguments))
+    histogram = {}
+    for lowest, counts in batches:
+        for offset in np.flatnonzero(counts):
+            histogram[lowest + int(offset)] = histogram.get(lowest + int(offset), 0) + int(counts[offset])
+    return summarize(histogram)
+
+
+def summarize(histogram):
+    """
+    :param histogram: a dict of score -> number of games
+    :return: a dict of the summary statistics of the scores, as returned by simulate
+    """
+    scores = np.array(sorted(histogram))
+    counts = np.array([histogram[score] for score in scores])
+    total = int(counts.sum())
+    if total == 0:
+        return {'games': 0, 'histogram': {}}
+    mean = float((scores * counts).sum() / total)
+    cumulative = np.cumsum(counts)
+    percentiles = {percentile: int(scores[np.searchsorted(cumulative, percentile / 100 * total)])
+                   for percentile in (5, 25, 50, 75, 95)}
+    return {'games': total,
+            'mean': mean,
+            'std': float(np.sqrt(((scores - mean) ** 2 * counts).sum() / total)),
+            'min': int(scores[0]),
+            'max': int(scores[-1]),
+            'percentiles': percentiles,
+            'histogram': {int(score): int(count) for score, count in zip(scores, counts)}}
+
+
+def guess_hit_columns(results):
+    """
+    An example guesser: guesses the first cell inside the black box below each top border position whose ray hit.
+    :param results: the exit positions of shooting from all 32 border positions in ENTRIES order
+    :return: a bool array of shape (games, 10, 10) of guesses
+    """
+    guesses = np.zeros((results.shape[0], ROWS, COLUMNS), dtype=bool)
+    guesses[:, 1, 1:9] = results[:, :8] == HIT
+    return guesses
+
+
+# BASIC TESTING
+if __name__ == '__main__':
+    import os
+    import random
+    import time
+    from BlackBoxGame import BlackBoxGame
+
+    print("\nBatch results match BlackBoxGame")
+    print("--------------------------------")
+    layouts = random_layouts(2000, 5, np.random.default_rng(261))
+    exits = trace_rays(board_values(layouts))
+    order = list(range(len(ENTRIES)))
+    random.Random(261).shuffle(order)
+    scores, _ = play(layouts, exits, order)
+    matches = True
+    for index in range(layouts.shape[0]):
+        game = BlackBoxGame([(position // 10, position % 10) for position in np.flatnonzero(layouts[index])])
+        for shot in order:
+            game.shoot_ray(ENTRIES[shot][0], ENTRIES[shot][1])
+        matches &= game.get_score() == scores[index]
+    print(matches)
+
+    print("\nScore distribution, 5 atoms, all rays, guessing below top hits")
+    print("--------------------------------------------------------------")
+    summary = simulate(200000, 5, guesser=guess_hit_columns, seed=261)
+    print({key: value for key, value in summary.items() if key != 'histogram'})
+
+    print("\nThroughput")
+    print("----------")
+    for processes in (1, os.cpu_count()):
+        start = time.perf_counter()
+        summary = simulate(1000000, 5, processes=processes, seed=261)
+        elapsed = time.perf_counter() - start
+        print(processes, 'processes:', round(summary['games'] / elapsed * 60), 'games per minute')
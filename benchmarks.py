@@ -0,0 +1,516 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: A benchmark suite for HashMap, MinHeap and BlackBoxGame (with the atom solver). Each benchmark case is a
+# parameterized workload: map capacity, number of keys, key distribution, hash function and operation mix for
+# HashMap; heap size and operation mix for MinHeap; atom count and number of shots for BlackBoxGame. Every case
+# reports throughput (operations per second), per-operation latency percentiles and peak memory measured with
+# tracemalloc. Fast operations are timed in batches, so the clock is not read around every sub-microsecond call, and
+# the medians over several runs are reported. The top-k stream benchmark pushes a long stream through a TopKHeap and
+# reports throughput and memory along the way. Results are written as JSON and compared with a stored baseline so
+# that regressions in throughput, latency or memory are flagged before a new version is deployed.
+# Usage: python benchmarks.py [--only TEXT] [--quick] [--output FILE] [--baseline FILE] [--save-baseline FILE]
+#        [--tolerance FRACTION] [--top-k-stream ITEMS]
+# The exit status is 1 if a result regressed against the baseline.
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from BlackBoxGame import CELLS, ENTRIES
+
+# metric -> (True if a larger value is better, True if the metric is a time or rate that depends on machine speed,
+# multiple of the tolerance allowed for the metric)
+METRICS = {'ops_per_second': (True, True, 1), 'p50_us': (False, True, 1), 'p99_us': (False, True, 2),
+           'peak_memory_bytes': (False, False, 1)}
+MIN_TAIL_SAMPLES = 100                      # p99 is only compared for cases timed in at least this many batches
+
+
+class Case:
+    """
+    Represents one benchmark workload. make(rng) builds the workload and returns an iterable of (function, arguments)
+    operations, which are timed batch operations at a time.
+    """
+
+    def __init__(self, suite, name, params, make, batch=1):
+        """
+        :param suite: the module the case exercises ('hash_map', 'min_heap' or 'game')
+        :param name: a unique name of the case, including its parameters
+        :param params: a dict of the workload parameters, stored with the results
+        :param make: a function taking a random.Random and returning a list (or a generator, to stream long workloads)
+        of operations
+        :param batch: the number of operations timed together; 1 for slow operations, more for operations so fast that
+        reading the clock around each of them would dominate the time
+        """
+        self.suite = suite
+        self.name = name
+        self.params = params
+        self.make = make
+        self.batch = batch
+
+
+def _keys(distribution, count, operations, rng):
+    """
+    :param distribution: 'sequential' (key0, key1, ...), 'uniform' (random keys drawn evenly from count keys) or
+    'skewed' (a few keys are drawn much more often than the rest)
+    :return: a list of operations keys drawn from count distinct keys
+    """
+    if distribution == 'sequential':
+        return ['key' + str(i % count) for i in range(operations)]
+    if distribution == 'uniform':
+        return ['key' + str(rng.randrange(count)) for _ in range(operations)]
+    if distribution == 'skewed':
+        return ['key' + str(int(count * rng.random() ** 4)) for _ in range(operations)]
+    raise ValueError('unknown key distribution ' + distribution)
+
+
+def hash_map_cases(quick=False):
+    """
+    :return: a list of HashMap cases over capacities, key counts, key distributions, hash functions and op mixes
+    """
+    import hash_map
+
+    functions = {'hash1': hash_map.hash_function_1, 'hash2': hash_map.hash_function_2}
+    mixes = {'put': (1.0, 0.0, 0.0, 0.0), 'read_heavy': (0.1, 0.7, 0.15, 0.05), 'churn': (0.4, 0.2, 0.0, 0.4)}
+    cases = []
+    for capacity, keys in ((50, 1000), (1000, 10000)) if not quick else ((50, 500),):
+        for distribution in ('sequential', 'uniform', 'skewed'):
+            for function_name, function in functions.items():
+                for mix_name, mix in mixes.items():
+                    operations = 4 * keys
+
+                    def make(rng, capacity=capacity, keys=keys, distribution=distribution, function=function,
+                             mix=mix, operations=operations):
+                        m = hash_map.HashMap(capacity, function)
+                        for key in _keys('sequential', keys // 2, keys // 2, rng):  # half the keys are present
+                            m.put(key, 0)
+                        kinds = rng.choices((m.put, m.get, m.contains_key, m.remove), weights=mix, k=operations)
+                        return [(kind, (key, i) if kind == m.put else (key,))
+                                for i, (kind, key) in enumerate(zip(kinds, _keys(distribution, keys, operations, rng)))]
+
+                    params = {'capacity': capacity, 'keys': keys, 'distribution': distribution,
+                              'hash_function': function_name, 'mix': mix_name, 'operations': operations}
+                    name = 'hash_map/cap%d/keys%d/%s/%s/%s' % (capacity, keys, distribution, function_name, mix_name)
+                    cases.append(Case('hash_map', name, params, make, batch=100))
+    for capacity, keys in ((50, 5000),) if not quick else ((50, 500),):
+
+        def make(rng, capacity=capacity, keys=keys):
+            operations = []
+            for _ in range(5):
+                m = hash_map.HashMap(capacity, hash_map.hash_function_2)
+                for key in _keys('sequential', keys, keys, rng):
+                    m.put(key, 0)
+                operations.append((m.resize_table, (capacity * 20,)))
+            return operations
+
+        params = {'capacity': capacity, 'keys': keys, 'mix': 'resize', 'new_capacity': capacity * 20}
+        cases.append(Case('hash_map', 'hash_map/cap%d/keys%d/resize' % (capacity, keys), params, make))
+    return cases
+
+
+def min_heap_cases(quick=False):
+    """
+    :return: a list of MinHeap cases over heap sizes and op mixes (add only, add/remove_min mix, drain, build_heap)
+    """
+    import min_heap
+
+    cases = []
+    for size in (1000, 20000) if not quick else (1000,):
+
+        def make_add(rng, size=size):
+            heap = min_heap.MinHeap()
+            return [(heap.add, (rng.random(),)) for _ in range(size)]
+
+        def make_mixed(rng, size=size):
+            heap = min_heap.MinHeap([rng.random() for _ in range(size // 2)])
+            operations, length = [], size // 2
+            for _ in range(size):
+                if length and rng.random() < 0.5:
+                    operations.append((heap.remove_min, ()))
+                    length -= 1
+                else:
+                    operations.append((heap.add, (rng.random(),)))
+                    length += 1
+            return operations
+
+        def make_drain(rng, size=size):
+            heap = min_heap.MinHeap([rng.random() for _ in range(size)])
+            return [(heap.remove_min, ())] * size
+
+        def make_build(rng, size=size):
+            heap = min_heap.MinHeap()
+            return [(heap.build_heap, (min_heap.DynamicArray([rng.random() for _ in range(size)]),))
+                    for _ in range(10)]
+
+        mixes = [('add', make_add), ('mixed', make_mixed), ('drain', make_drain)]
+        if size <= 1000:                        # build_heap restarts from where a percolation ends, so large sizes
+            mixes.append(('build', make_build))     # take minutes
+        for mix, make in mixes:
+            params = {'size': size, 'mix': mix}
+            batch = 1 if mix == 'build' else 100
+            cases.append(Case('min_heap', 'min_heap/size%d/%s' % (size, mix), params, make, batch))
+    stream = 200000 if not quick else 20000
+    for k in (10, 1000):
+
+        def make_top_k(rng, k=k):
+            push = min_heap.TopKHeap(k).push
+            draw = rng.random
+            return ((push, (draw(),)) for _ in range(stream))       # streamed, not held in memory
+
+        params = {'k': k, 'stream': stream, 'mix': 'top_k'}
+        cases.append(Case('min_heap', 'min_heap/topk%d/stream%d' % (k, stream), params, make_top_k, batch=1000))
+    return cases
+
+
+def top_k_stream(items=10 ** 6, k=100, checkpoints=10, seed=261, trace_memory=True, report=print):
+    """
+    Streams random scores through a TopKHeap without holding the stream in memory, to show that throughput and
+    memory stay constant as the stream grows.
+    :param items: the length of the stream (10 ** 8 takes minutes)
+    :param k: the capacity of the TopKHeap
+    :param checkpoints: the number of equal stretches of the stream measured separately
+    :param trace_memory: measure the traced memory with tracemalloc, which slows down the stream
+    :param report: a function called with a line per checkpoint (None for silence)
+    :return: a list of dicts per checkpoint of the items seen so far, items per second over the stretch, and the
+    current and peak traced memory in bytes (None without trace_memory); the traced memory includes these results,
+    which grow by a dict per checkpoint
+    """
+    import min_heap
+
+    rng = random.Random(seed)
+    draw = rng.random
+    top = min_heap.TopKHeap(k)
+    stretch = items // checkpoints
+    results = []
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        seen = 0
+        for _ in range(checkpoints):
+            start = time.perf_counter()
+            top.push_all(draw() for _ in range(stretch))
+            elapsed = time.perf_counter() - start
+            seen += stretch
+            current, peak = tracemalloc.get_traced_memory() if trace_memory else (None, None)
+            results.append({'items': seen, 'items_per_second': stretch / elapsed, 'current_memory_bytes': current,
+                            'peak_memory_bytes': peak})
+            if report:
+                report('%12d items %12.0f items/s  memory %s B  peak %s B' % (seen, stretch / elapsed, current, peak))
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return results
+
+
+def _play(game_class, atoms, shots, guesses):
+    """
+    Plays one game: constructs it, shoots the rays and makes the guesses
+    """
+    game = game_class(atoms)
+    for row, column in shots:
+        game.shoot_ray(row, column)
+    for row, column in guesses:
+        game.guess_atom(row, column)
+    return game.get_score()
+
+
+def _solve(solver_class, observations, atom_count):
+    """
+    Counts the placements consistent with the observations
+    """
+    return solver_class(observations, atom_count).count()
+
+
+def game_cases(quick=False):
+    """
+    :return: a list of BlackBoxGame cases over atom counts and numbers of shots, including incremental atom edits and
+    the atom solver. The board is always the 10x10 board of BlackBoxGame.
+    """
+    import BlackBoxGame
+    import atom_solver
+
+    cases = []
+    games = 200 if not quick else 100
+    for atoms in (4, 6, 8) if not quick else (4, 8):
+        for shots in (8, 32):
+
+            def make_play(rng, atoms=atoms, shots=shots):
+                operations = []
+                for _ in range(games):
+                    layout = rng.sample(CELLS, atoms)
+                    guesses = rng.sample(layout, atoms // 2) + rng.sample(CELLS, 2)
+                    operations.append((_play, (BlackBoxGame.BlackBoxGame, layout, rng.sample(ENTRIES, shots),
+                                               guesses)))
+                return operations
+
+            params = {'atoms': atoms, 'shots': shots, 'games': games}
+            cases.append(Case('game', 'game/atoms%d/shots%d/play' % (atoms, shots), params, make_play))
+
+        def make_edit(rng, atoms=atoms):
+            layout = rng.sample(CELLS, atoms)
+            empty = [cell for cell in CELLS if cell not in layout]     # every edit places and removes a new atom,
+            game = BlackBoxGame.BlackBoxGame(layout)                    # so the game keeps its atoms
+            for row, column in ENTRIES:
+                game.trace_ray(row, column)
+            operations = []
+            for _ in range(games):
+                cell = rng.choice(empty)
+                operations.append((game.place_atom, cell))
+                operations.append((game.trace_ray, rng.choice(ENTRIES)))
+                operations.append((game.remove_atom, cell))
+            return operations
+
+        params = {'atoms': atoms, 'edits': games}
+        cases.append(Case('game', 'game/atoms%d/edit' % atoms, params, make_edit, batch=30))
+
+        def make_solve(rng, atoms=atoms):
+            operations = []
+            for _ in range(3):
+                layout = rng.sample(CELLS, atoms)
+                observations = {entry: atom_solver.trace(layout, entry[0], entry[1])
+                                for entry in rng.sample(ENTRIES, 16)}
+                operations.append((_solve, (atom_solver.AtomSolver, observations, atoms)))
+            return operations
+
+        if atoms <= 6:                                  # larger counts take seconds per layout at 16 shots
+            params = {'atoms': atoms, 'shots': 16, 'layouts': 3}
+            cases.append(Case('game', 'game/atoms%d/shots16/solve' % atoms, params, make_solve))
+    return cases
+
+
+SUITES = {'hash_map': hash_map_cases, 'min_heap': min_heap_cases, 'game': game_cases}
+
+
+def _time_run(case, seed):
+    """
+    Runs the workload of a case once, timing its operations case.batch at a time. The operations of a batch are taken
+    from the workload before the clock starts, and the garbage collector is paused while the workload runs (as timeit
+    does), so collections caused by earlier cases do not land in the batches of this one.
+    :return: (number of operations, total nanoseconds, sorted list of the mean nanoseconds per operation of each batch)
+    """
+    clock = time.process_time_ns
+    operations = iter(case.make(random.Random(seed)))
+    count = total = 0
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        while True:
+            batch = list(itertools.islice(operations, case.batch))
+            if not batch:
+                break
+            start = clock()
+            for function, arguments in batch:
+                function(*arguments)
+            elapsed = clock() - start
+            count += len(batch)
+            total += elapsed
+            samples.append(elapsed / len(batch))
+    finally:
+        gc.enable()
+    samples.sort()
+    return count, total, samples
+
+
+def calibrate():
+    """
+    Times a fixed pure Python workload (dict updates in a loop), the best of 3 runs.
+    :return: nanoseconds; results measured on a machine running slower or faster by some factor are scaled by the ratio
+    of their calibrations when compared
+    """
+    best = None
+    for _ in range(3):
+        counts = {}
+        start = time.process_time_ns()
+        for i in range(100000):
+            counts[i & 1023] = counts.get(i & 1023, 0) + i
+        elapsed = time.process_time_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _measure(case, seed):
+    """
+    Times one run of a case right after a calibration.
+    :return: (calibration nanoseconds, number of operations, total nanoseconds, sorted batch samples) as _time_run
+    """
+    calibration = calibrate()
+    return (calibration,) + _time_run(case, seed)
+
+
+def _peak_memory(case, seed):
+    """
+    :return: the peak bytes traced by tracemalloc while running the workload of a case. The workload is built before
+    tracing starts, so its list of operations (and the structures it starts from) are not counted; the peak is the
+    memory the operations allocate.
+    """
+    operations = case.make(random.Random(seed))
+    tracemalloc.start()
+    try:
+        for function, arguments in operations:
+            function(*arguments)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _summarize(case, runs, peak):
+    """
+    :param runs: the results of _measure for every timed run of the case
+    :param peak: the peak memory of the case
+    :return: a dict of the case's params, the batch size and number of batches, ops_per_second and latency percentiles
+    in microseconds per operation (each the median over the runs; percentiles are over batches, so over single
+    operations only where the batch is 1), peak_memory_bytes, the median calibration and 'calibrated': the medians of
+    ops_per_second, p50_us and p99_us of every run scaled by the calibration taken just before that run, to compare
+    with results measured while the machine ran at another speed
+    """
+    rates, p50, p95, p99, maximum = [], [], [], [], []
+    calibrated = {'ops_per_second': [], 'p50_us': [], 'p99_us': []}
+    for calibration, count, total, samples in runs:
+        percentile = lambda fraction: samples[min(len(samples) - 1, int(fraction * len(samples)))] / 1000
+        rates.append(count / (total / 1e9) if total else float('inf'))
+        p50.append(percentile(0.50))
+        p95.append(percentile(0.95))
+        p99.append(percentile(0.99))
+        maximum.append(samples[-1] / 1000)
+        calibrated['ops_per_second'].append(rates[-1] * calibration / 1e9)     # operations per calibration
+        calibrated['p50_us'].append(p50[-1] * 1e6 / calibration)              # calibrations per million operations
+        calibrated['p99_us'].append(p99[-1] * 1e6 / calibration)
+    return {'params': case.params,
+            'operations': runs[0][1],
+            'batch': case.batch,
+            'batches': len(runs[0][3]),
+            'ops_per_second': statistics.median(rates),
+            'p50_us': statistics.median(p50),
+            'p95_us': statistics.median(p95),
+            'p99_us': statistics.median(p99),
+            'max_us': statistics.median(maximum),
+            'peak_memory_bytes': peak,
+            'calibration_ns': statistics.median(run[0] for run in runs),
+            'calibrated': {metric: statistics.median(values) for metric, values in calibrated.items()}}
+
+
+def run(suites=None, only=None, quick=False, repeat=5, report=print, seed=261):
+    """
+    Runs the selected cases. Each case is run once to warm up, then the timed runs take turns: every case is run once
+    before any case is run again, so a stretch of time in which the machine is busy with something else slows down one
+    run of several cases instead of every run of one case, and the medians leave it out.
+    :param suites: the names of the suites to run (all of SUITES by default)
+    :param only: run only the cases whose name contains this text (optional)
+    :param quick: use smaller workloads
+    :param repeat: the number of timed runs of each case
+    :param report: a function called with a progress line per case (None for silence)
+    :return: a JSON-serializable dict of 'meta' (interpreter, platform and time) and 'results' (case name -> result
+    as described in _summarize) and 'skipped' (suite -> reason) for suites whose modules cannot be imported
+    """
+    cases, skipped = [], {}
+    for suite in suites or SUITES:
+        try:
+            cases.extend(case for case in SUITES[suite](quick) if not only or only in case.name)
+        except ImportError as error:
+            skipped[suite] = str(error)
+            if report:
+                report('skipped %s: %s' % (suite, error))
+    for case in cases:
+        _time_run(case, seed)
+    runs = {case.name: [] for case in cases}
+    for _ in range(repeat):
+        for case in cases:
+            runs[case.name].append(_measure(case, seed))
+    results = {}
+    for case in cases:
+        result = results[case.name] = _summarize(case, runs[case.name], _peak_memory(case, seed))
+        if report:
+            report('%-52s %12.1f ops/s  p50 %8.1fus  p99 %8.1fus  peak %10d B'
+                   % (case.name, result['ops_per_second'], result['p50_us'], result['p99_us'],
+                      result['peak_memory_bytes']))
+    meta = {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'quick': quick,
+            'repeat': repeat}
+    return {'meta': meta, 'results': results, 'skipped': skipped}
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    :param current: results returned by run
+    :param baseline: results returned by run for the version to compare against
+    :param tolerance: the fraction a metric may get worse by before it counts as a regression (twice as much for p99)
+    :return: a list of (case name, metric, baseline value, current value, relative change) for every metric of a case
+    present in both results that got worse by more than the tolerance; a positive change is always worse. The change
+    of a time or rate is that of its calibrated value when both results have one, so a machine that runs slower as a
+    whole does not make every case a regression. p99 is skipped for cases timed in too few batches for it to be more
+    than the slowest batch.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        for metric, (higher_is_better, timed, allowance) in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            if metric == 'p99_us' and result.get('batches', 0) < MIN_TAIL_SAMPLES:
+                continue
+            compared_old, compared_new = old, new
+            if timed and metric in before.get('calibrated', {}) and metric in result.get('calibrated', {}):
+                compared_old, compared_new = before['calibrated'][metric], result['calibrated'][metric]
+            if higher_is_better:
+                change = (compared_old - compared_new) / compared_old
+            else:
+                change = (compared_new - compared_old) / compared_old
+            if change > tolerance * allowance:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def main(arguments=None):
+    """
+    Runs the suite from the command line
+    :return: the exit status; 1 if a result regressed against the baseline, otherwise 0
+    """
+    parser = argparse.ArgumentParser(description='Benchmark HashMap, MinHeap and BlackBoxGame.')
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help='suite to run (repeatable)')
+    parser.add_argument('--only', help='run only cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='use smaller workloads')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file')
+    parser.add_argument('--save-baseline', help='also write the results to this JSON file as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed fraction a metric may get worse by')
+    parser.add_argument('--top-k-stream', type=int, metavar='ITEMS',
+                        help='only stream ITEMS random scores through a TopKHeap of 100 and report each tenth')
+    options = parser.parse_args(arguments)
+
+    if options.top_k_stream:
+        top_k_stream(options.top_k_stream)
+        return 0
+
+    current = run(options.suite, options.only, options.quick, options.repeat)
+    for path in (options.output, options.save_baseline):
+        if path:
+            with open(path, 'w') as file:
+                json.dump(current, file, indent=2, sort_keys=True)
+    if not options.baseline:
+        return 0
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(current, baseline, options.tolerance)
+    for name, metric, old, new, change in regressions:
+        print('REGRESSION %s %s: %.4g -> %.4g (%+.0f%% worse calibrated)' % (name, metric, old, new, change * 100))
+    missing = set(baseline['results']) - set(current['results'])
+    if missing and not options.only:
+        print('not run but in the baseline:', ', '.join(sorted(missing)))
+    print('%d regressions in %d compared cases' % (len(regressions), len(set(current['results']) &
+                                                                       set(baseline['results']))))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,372 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: An asyncio server hosting many concurrent BlackBoxGame sessions over a line-oriented protocol on TCP or
+# a Unix socket, and a load-generator client that reports latency percentiles and requests per second.
+# Each request is one line of whitespace separated words and is answered with one line, "OK ..." or "ERR <message>"
+# (non-ASCII bytes are echoed backslash-escaped and a line longer than 64 KiB is answered "ERR line too long"):
+#   NEW <row>,<column> ...              -> OK <session id>       starts a game with atoms at the given positions
+#   SHOOT <session id> <row> <column>   -> OK <row> <column>     the exit point, or OK NONE for a hit; a position
+#                                                                that cannot be shot from (a corner, inside the box or
+#                                                                already marked by a ray) is an ERR and costs nothing
+#   GUESS <session id> <row> <column>   -> OK TRUE, OK FALSE or OK NONE (already guessed)
+#   SCORE <session id>                  -> OK <score>
+#   LEFT <session id>                   -> OK <atoms left>
+#   CLOSE <session id>                  -> OK
+# Sessions live in a bounded store; the least recently used session is evicted when the store is full and sessions
+# idle for longer than the timeout are evicted periodically. Games with the same atoms share one precomputed table of
+# the rays from every border position.
+
+from collections import OrderedDict
+import asyncio
+import itertools
+import random
+import statistics
+import time
+
+from BlackBoxGame import BlackBoxGame, CELLS, ENTRIES
+
+
+class SessionStore:
+    """
+    Represents a bounded collection of game sessions keyed by session id, ordered from least to most recently used.
+    Games with the same list of atoms share a table of traced rays that lives as long as one of those games does.
+    """
+
+    def __init__(self, max_sessions=10000, idle_timeout=300.0, clock=time.monotonic):
+        """
+        :param max_sessions: the number of sessions kept before the least recently used one is evicted
+        :param idle_timeout: seconds a session may go unused before evict_idle removes it
+        :param clock: a function returning the current time in seconds
+        """
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        self._sessions = OrderedDict()          # session id -> [game, layout, time of last use]
+        self._layouts = {}                      # layout -> [shared ray table, number of sessions using it]
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, atoms):
+        """
+        :param atoms: a list of (row, column) atom positions
+        :return: the id of a new session playing a game with those atoms
+        """
+        layout = tuple(sorted(atoms))
+        shared = self._layouts.get(layout)
+        if shared is None:
+            shared = self._layouts[layout] = [{}, 0]
+        game = BlackBoxGame(list(atoms), ray_cache=shared[0])
+        if shared[1] == 0:                                  # first game with these atoms traces every ray once
+            for row, column in ENTRIES:
+                game.trace_ray(row, column)
+        shared[1] += 1
+        session_id = next(self._ids)
+        self._sessions[session_id] = [game, layout, self._clock()]
+        while len(self._sessions) > self._max_sessions:
+            self.close(next(iter(self._sessions)))
+        return session_id
+
+    def get(self, session_id):
+        """
+        :return: the game of the session, or None if there is no such session; marks the session as used
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        session[2] = self._clock()
+        self._sessions.move_to_end(session_id)
+        return session[0]
+
+    def close(self, session_id):
+        """
+        :return: True if the session was removed, False if there is no such session
+        """
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        shared = self._layouts[session[1]]
+        shared[1] -= 1
+        if shared[1] == 0:
+            del self._layouts[session[1]]
+        return True
+
+    def evict_idle(self):
+        """
+        :return: the number of sessions removed for having been idle for longer than the timeout
+        """
+        deadline = self._clock() - self._idle_timeout
+        evicted = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session[2] > deadline:                       # sessions after the first are used more recently
+                break
+            self.close(session_id)
+            evicted += 1
+        return evicted
+
+    def layouts(self):
+        """
+        :return: the number of distinct atom layouts with a shared ray table
+        """
+        return len(self._layouts)
+
+
+class BlackBoxServer:
+    """
+    Represents a server answering protocol requests for the sessions of a SessionStore
+    """
+
+    def __init__(self, store=None, evict_interval=10.0):
+        """
+        :param store: the SessionStore holding the sessions (a new default store if None)
+        :param evict_interval: seconds between evictions of idle sessions
+        """
+        self._store = SessionStore() if store is None else store
+        self._evict_interval = evict_interval
+        self._commands = {'NEW': self._new, 'SHOOT': self._shoot, 'GUESS': self._guess, 'SCORE': self._score,
+                          'LEFT': self._left, 'CLOSE': self._close}
+
+    def dispatch(self, line):
+        """
+        :param line: one request line
+        :return: the response line, without the line ending
+        """
+        words = line.split()
+        if not words:
+            return 'ERR empty request'
+        command = self._commands.get(words[0].upper())
+        if command is None:
+            return 'ERR unknown command ' + words[0]
+        try:
+            return command(words[1:])
+        except (ValueError, IndexError):
+            return 'ERR malformed request'
+
+    def _new(self, words):
+        """
+        Starts a session: NEW <row>,<column> ...
+        """
+        atoms = [tuple(int(value) for value in word.split(',')) for word in words]
+        if any(len(atom) != 2 or not (1 <= atom[0] <= 8 and 1 <= atom[1] <= 8) for atom in atoms):
+            return 'ERR atoms must be row,column positions inside the black box'
+        return 'OK %d' % self._store.create(atoms)
+
+    def _shoot(self, words):
+        """
+        Shoots a ray: SHOOT <session id> <row> <column>
+        """
+        game = self._store.get(int(words[0]))
+        if game is None:
+            return 'ERR no session ' + words[0]
+        row, column = int(words[1]), int(words[2])
+        if not game.can_shoot(row, column):
+            return 'ERR cannot shoot from %d %d' % (row, column)
+        result = game.shoot_ray(row, column)
+        if result is None:
+            return 'OK NONE'
+        return 'OK %d %d' % result
+
+    def _guess(self, words):
+        """
+        Guesses an atom: GUESS <session id> <row> <column>
+        """
+        game = self._store.get(int(words[0]))
+        if game is None:
+            return 'ERR no session ' + words[0]
+        return 'OK ' + str(game.guess_atom(int(words[1]), int(words[2]))).upper()
+
+    def _score(self, words):
+        """
+        Reports the score: SCORE <session id>
+        """
+        game = self._store.get(int(words[0]))
+        if game is None:
+            return 'ERR no session ' + words[0]
+        return 'OK %d' % game.get_score()
+
+    def _left(self, words):
+        """
+        Reports the atoms left: LEFT <session id>
+        """
+        game = self._store.get(int(words[0]))
+        if game is None:
+            return 'ERR no session ' + words[0]
+        return 'OK %d' % game.atoms_left()
+
+    def _close(self, words):
+        """
+        Ends a session: CLOSE <session id>
+        """
+        if not self._store.close(int(words[0])):
+            return 'ERR no session ' + words[0]
+        return 'OK'
+
+    async def handle(self, reader, writer):
+        """
+        Answers the requests of one connection until the client disconnects
+        """
+        try:
+            while True:
+                line = await _read_line(reader)
+                if line is None:
+                    response = 'ERR line too long'
+                elif not line:
+                    break
+                else:
+                    response = self.dispatch(line.decode('ascii', 'replace'))
+                writer.write(response.encode('ascii', 'backslashreplace') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _evict(self):
+        """
+        Evicts idle sessions every evict_interval seconds
+        """
+        while True:
+            await asyncio.sleep(self._evict_interval)
+            self._store.evict_idle()
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        :param host and port: the TCP address to listen on (port 0 picks a free port)
+        :param path: a Unix socket path to listen on instead of TCP (optional)
+        :return: the started asyncio server; idle sessions are evicted while it is serving
+        """
+        if path is None:
+            server = await asyncio.start_server(self.handle, host, port)
+        else:
+            server = await asyncio.start_unix_server(self.handle, path)
+        loop = asyncio.get_running_loop()
+        evictor = loop.create_task(self._evict())
+        loop.create_task(_cancel_when_closed(server, evictor))
+        return server
+
+
+async def _read_line(reader):
+    """
+    :return: the next line from the reader, b'' at the end of the stream, or None for a line longer than the limit of
+    the reader, which is read up to its line ending and dropped
+    """
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as error:            # the last line has no line ending
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        while True:
+            await reader.readexactly(error.consumed)        # drops what is buffered of the line
+            try:
+                await reader.readuntil(b'\n')
+                return None
+            except asyncio.IncompleteReadError:
+                return b''
+            except asyncio.LimitOverrunError as more:
+                error = more
+
+
+async def _cancel_when_closed(server, task):
+    """
+    Cancels the task once the server is closed
+    """
+    await server.wait_closed()
+    task.cancel()
+
+
+async def load_test(host='127.0.0.1', port=None, path=None, connections=50, requests=2000, atoms=5, layouts=20,
+                    seed=None):
+    """
+    Plays random games against a running server and measures the latency of every request.
+    :param host and port: the TCP address of the server
+    :param path: the Unix socket path of the server instead of TCP (optional)
+    :param connections: the number of concurrent client connections, each playing its own sessions
+    :param requests: the number of requests sent over each connection
+    :param atoms: the number of atoms in each game
+    :param layouts: the number of distinct atom layouts the games are drawn from
+    :param seed: seed for the random games (optional)
+    :return: a dict of the number of requests, errors, requests per second and p50/p99 latency in milliseconds
+    """
+    rng = random.Random(seed)
+    boards = [rng.sample(CELLS, atoms) for _ in range(layouts)]
+    latencies = []
+    errors = 0
+
+    async def client(client_rng):
+        nonlocal errors
+        if path is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path)
+        session = None
+        for _ in range(requests):
+            if session is None:
+                line = 'NEW ' + ' '.join('%d,%d' % atom for atom in client_rng.choice(boards))
+            else:
+                kind = client_rng.random()
+                if kind < 0.6 and len(fired) < len(ENTRIES):    # only shoot from positions no ray used yet
+                    entry = client_rng.choice([entry for entry in ENTRIES if entry not in fired])
+                    line = 'SHOOT %s %d %d' % ((session,) + entry)
+                elif kind < 0.8:
+                    line = 'GUESS %s %d %d' % ((session,) + client_rng.choice(CELLS))
+                elif kind < 0.9:
+                    line = 'SCORE ' + session
+                elif kind < 0.98:
+                    line = 'LEFT ' + session
+                else:
+                    line = 'CLOSE ' + session
+            start = time.perf_counter()
+            writer.write(line.encode('ascii') + b'\n')
+            response = (await reader.readline()).decode('ascii').split()
+            latencies.append(time.perf_counter() - start)
+            if not response or response[0] != 'OK':
+                errors += 1
+            elif line.startswith('NEW'):
+                session = response[1]
+                fired = set()
+            elif line.startswith('SHOOT'):
+                fired.add(entry)
+                if response[1] != 'NONE':
+                    fired.add((int(response[1]), int(response[2])))
+            elif line.startswith('CLOSE'):
+                session = None
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(random.Random(rng.random())) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {'requests': len(latencies), 'errors': errors, 'requests_per_second': len(latencies) / elapsed,
+            'p50_ms': percentiles[49] * 1000, 'p99_ms': percentiles[98] * 1000}
+
+
+# BASIC TESTING
+if __name__ == '__main__':
+
+    async def main():
+        print("\nProtocol example")
+        print("----------------")
+        server = BlackBoxServer()
+        for line in ['NEW 3,2 3,7 6,4 8,7', 'SHOOT 1 3 9', 'SHOOT 1 0 2', 'SHOOT 1 0 2', 'GUESS 1 3 2', 'GUESS 1 1 1',
+                     'SCORE 1', 'LEFT 1', 'CLOSE 1', 'SCORE 1', 'FIRE 1']:
+            print(line, '->', server.dispatch(line))
+
+        print("\nLoad test")
+        print("---------")
+        store = SessionStore(max_sessions=1000, idle_timeout=60.0)
+        listener = await BlackBoxServer(store).start()
+        port = listener.sockets[0].getsockname()[1]
+        result = await load_test(port=port, seed=261)
+        print(result)
+        print(len(store), 'sessions', store.layouts(), 'shared ray tables')
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(main())
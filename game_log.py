@@ -0,0 +1,329 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: An append-only binary event log of BlackBoxGame games and a streaming replayer for it. A game created
+# with an EventLog records its construction and every shot, guess, atom placement, atom removal and restore to the log.
+# The replayer reads the log through a memory map, one record at a time, rebuilds each game by repeating its events and
+# yields the games lazily as they end, so recorded play can be re-scored under a different ScoringPolicy.
+# A log starts with the 8 byte MAGIC. Each record is a 1 byte kind and a 4 byte game id (little-endian) followed by:
+#   CONSTRUCT   2 byte atom count (little-endian, so at most 65535 atoms), then a signed byte row and column per atom
+#   SHOT, GUESS, PLACE, REMOVE   signed byte row and column; with the WIDE flag set in the kind (for a guess of a
+#               position that does not fit in signed bytes), a 1 byte size and a signed row and column of that size
+#   SNAPSHOT, RESTORE   a snapshot packed by BlackBoxGame.pack (SNAPSHOT_SIZE bytes) that was taken or restored
+#   END         nothing
+
+import mmap
+import os
+import struct
+
+from BlackBoxGame import BlackBoxGame, SNAPSHOT_SIZE
+
+MAGIC = b'BBXLOG2\n'
+CONSTRUCT, SHOT, GUESS, PLACE, REMOVE, RESTORE, END, SNAPSHOT = range(1, 9)
+WIDE = 0x80                                 # flag of a position record with a row and column wider than a byte
+
+_HEADER = struct.Struct('<BI')
+_POSITION = struct.Struct('<bb')
+_COUNT = struct.Struct('<H')
+
+
+class EventLog:
+    """
+    Represents an event log file that games append their events to. Game ids are assigned in order of construction and
+    continue after the ids already in the file when an existing log is appended to.
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        """
+        :param path: the path of the log file; created if it does not exist
+        :param buffer_size: the number of bytes buffered before they are written to the file
+        """
+        self._next_id = 1
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        end = 0                                             # the end of the last complete record
+        if size >= len(MAGIC):
+            end = len(MAGIC)
+            for kind, game_id, _, end in _records(path):
+                if kind == CONSTRUCT:
+                    self._next_id = max(self._next_id, game_id + 1)
+        elif size > 0:
+            with open(path, 'rb') as file:
+                if not MAGIC.startswith(file.read()):
+                    raise ValueError('%s is not an event log' % path)
+        if end < size:                                      # drop a record cut short by an interrupted write
+            os.truncate(path, end)
+        self._file = open(path, 'ab', buffering=buffer_size)
+        if end == 0:
+            self._file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def construct(self, atoms_list):
+        """
+        :param atoms_list: the atom positions of a new game
+        :return: the id assigned to the game
+        """
+        if len(atoms_list) > 0xFFFF:
+            raise ValueError('a logged game has at most 65535 atoms, not %d' % len(atoms_list))
+        game_id = self._next_id
+        self._next_id += 1
+        self._file.write(_HEADER.pack(CONSTRUCT, game_id) + _COUNT.pack(len(atoms_list)) +
+                         b''.join(_POSITION.pack(row, column) for row, column in atoms_list))
+        return game_id
+
+    def _position(self, kind, game_id, row, column):
+        """
+        Appends a record of the given kind with a row and column, in the WIDE form if they do not fit in signed bytes
+        """
+        if -128 <= row <= 127 and -128 <= column <= 127:
+            self._file.write(_HEADER.pack(kind, game_id) + _POSITION.pack(row, column))
+        else:
+            size = (max(row.bit_length(), column.bit_length()) + 8) // 8
+            self._file.write(_HEADER.pack(kind | WIDE, game_id) + bytes([size]) +
+                             row.to_bytes(size, 'little', signed=True) + column.to_bytes(size, 'little', signed=True))
+
+    def shot(self, game_id, row, column):
+        """
+        Records a ray shot from (row, column)
+        """
+        self._position(SHOT, game_id, row, column)
+
+    def guess(self, game_id, row, column):
+        """
+        Records a guess of an atom at (row, column)
+        """
+        self._position(GUESS, game_id, row, column)
+
+    def place(self, game_id, row, column):
+        """
+        Records an atom placed at (row, column)
+        """
+        self._position(PLACE, game_id, row, column)
+
+    def remove(self, game_id, row, column):
+        """
+        Records an atom removed from (row, column)
+        """
+        self._position(REMOVE, game_id, row, column)
+
+    def snapshot(self, game_id, snapshot):
+        """
+        Records a snapshot taken of a game
+        """
+        self._file.write(_HEADER.pack(SNAPSHOT, game_id) + BlackBoxGame.pack(snapshot))
+
+    def restore(self, game_id, snapshot):
+        """
+        Records a game restored to a snapshot
+        """
+        self._file.write(_HEADER.pack(RESTORE, game_id) + BlackBoxGame.pack(snapshot))
+
+    def end(self, game):
+        """
+        :param game: a game logged to this log
+        Records the end of the game; the replayer yields the game when it reaches this record.
+        """
+        self._file.write(_HEADER.pack(END, game.get_log_id()))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_events(path):
+    """
+    :param path: the path of a log file
+    :return: a generator of (kind, game id, payload) for every record in the file, in order. The payload is a list of
+    (row, column) atom positions for CONSTRUCT, a (row, column) tuple for SHOT, GUESS, PLACE and REMOVE, a snapshot
+    tuple for SNAPSHOT and RESTORE and None for END. A record cut short at the end of the file (by an interrupted write)
+    is ignored.
+    """
+    for kind, game_id, payload, _ in _records(path):
+        yield kind, game_id, payload
+
+
+def _records(path):
+    """
+    :param path: the path of a log file
+    :return: a generator of (kind, game id, payload, end) as read_events, where end is the offset just past the record
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < len(MAGIC):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError('%s is not an event log' % path)
+            offset = len(MAGIC)
+            size = len(data)
+            while offset + _HEADER.size <= size:
+                kind, game_id = _HEADER.unpack_from(data, offset)
+                offset += _HEADER.size
+                if kind == CONSTRUCT:
+                    if offset + _COUNT.size > size:
+                        return
+                    count, = _COUNT.unpack_from(data, offset)
+                    offset += _COUNT.size
+                    if offset + 2 * count > size:
+                        return
+                    payload = [_POSITION.unpack_from(data, offset + 2 * i) for i in range(count)]
+                    offset += 2 * count
+                elif kind == RESTORE or kind == SNAPSHOT:
+                    if offset + SNAPSHOT_SIZE > size:
+                        return
+                    payload = BlackBoxGame.unpack(data[offset:offset + SNAPSHOT_SIZE])
+                    offset += SNAPSHOT_SIZE
+                elif kind == END:
+                    payload = None
+                elif kind in (SHOT, GUESS, PLACE, REMOVE):
+                    if offset + _POSITION.size > size:
+                        return
+                    payload = _POSITION.unpack_from(data, offset)
+                    offset += _POSITION.size
+                elif kind & ~WIDE in (SHOT, GUESS, PLACE, REMOVE):
+                    if offset >= size or offset + 1 + 2 * data[offset] > size:
+                        return
+                    width = data[offset]
+                    payload = (int.from_bytes(data[offset + 1:offset + 1 + width], 'little', signed=True),
+                               int.from_bytes(data[offset + 1 + width:offset + 1 + 2 * width], 'little', signed=True))
+                    kind &= ~WIDE
+                    offset += 1 + 2 * width
+                else:
+                    raise ValueError('unknown record kind %d at byte %d of %s' % (kind, offset - _HEADER.size, path))
+                yield kind, game_id, payload, offset
+
+
+def replay(path, scoring=None, max_layouts=4096, max_games=65536):
+    """
+    Rebuilds the games of a log by repeating their events.
+    :param path: the path of a log file
+    :param scoring: the ScoringPolicy to score the rebuilt games with (optional; the standard rules if None)
+    :param max_layouts: the number of distinct atom layouts whose ray tables are kept to be shared between games
+    :param max_games: the number of games in progress held in memory (None for no limit)
+    :return: a generator of (game id, game) yielded as each game ends. Only the games in progress and the snapshots
+    taken in them are held in memory. A game without an END record is yielded as it is when max_games later games are
+    in progress, and its later events are ignored; the ones still in progress at the last record are yielded after it,
+    in order of id.
+    A game is restored to the replayed state it was in when the logged snapshot was taken (in that game, or else in the
+    game in progress that took it last), so scores are those of the scoring policy and not the ones stored in the
+    snapshot. Only a snapshot that was not taken in a logged game in progress is restored with its stored score.
+    """
+    games = {}                                              # game id -> game, in order of construction
+    snapshots = {}                                          # logged snapshot -> game id -> replayed state
+    taken = {}                                              # game id -> the logged snapshots taken in the game
+    tables = {}                                             # atom layout -> ray table shared by its games
+
+    def finish(game_id):
+        for snapshot in taken.pop(game_id):
+            states = snapshots[snapshot]
+            del states[game_id]
+            if not states:
+                del snapshots[snapshot]
+        return games.pop(game_id)
+
+    for kind, game_id, payload in read_events(path):
+        if kind == CONSTRUCT:
+            if max_games is not None and len(games) >= max_games:
+                oldest = next(iter(games))
+                yield oldest, finish(oldest)
+            layout = tuple(sorted(payload))
+            table = tables.get(layout)
+            if table is None:
+                if len(tables) >= max_layouts:
+                    tables.clear()
+                table = tables[layout] = {}
+            games[game_id] = BlackBoxGame(payload, ray_cache=table, scoring=scoring)
+            taken[game_id] = set()
+            continue
+        game = games.get(game_id)
+        if game is None:                                    # the construction of the game is not in the log
+            continue
+        if kind == SHOT:
+            game.shoot_ray(payload[0], payload[1])
+        elif kind == GUESS:
+            game.guess_atom(payload[0], payload[1])
+        elif kind == PLACE:
+            game.place_atom(payload[0], payload[1])
+        elif kind == REMOVE:
+            game.remove_atom(payload[0], payload[1])
+        elif kind == SNAPSHOT:
+            states = snapshots.setdefault(payload, {})
+            states.pop(game_id, None)                       # moves the game to the end as the latest to take it
+            states[game_id] = game._state()
+            taken[game_id].add(payload)
+        elif kind == RESTORE:
+            states = snapshots.get(payload)
+            if states is None:                              # a snapshot not taken in a game in progress
+                game.restore(payload)
+            elif game_id in states:
+                game._set_state(states[game_id])
+            else:
+                game._set_state(next(reversed(states.values())))
+        elif kind == END:
+            yield game_id, finish(game_id)
+    for game_id in sorted(games):
+        yield game_id, games[game_id]
+
+
+def rescore(path, scoring=None):
+    """
+    :param path: the path of a log file
+    :param scoring: the ScoringPolicy to score the games with (optional; the standard rules if None)
+    :return: a generator of (game id, score, atoms left) for every game in the log, as replay yields them
+    """
+    for game_id, game in replay(path, scoring):
+        yield game_id, game.get_score(), game.atoms_left()
+
+
+# BASIC TESTING
+if __name__ == '__main__':
+    import random
+    import tempfile
+    import time
+    from BlackBoxGame import ScoringPolicy
+
+    class FlatRayScoring(ScoringPolicy):
+        """Every ray costs 1 point and a wrong guess costs 3"""
+
+        def ray_score(self, entry, result):
+            return -1
+
+        def guess_score(self, correct):
+            return 0 if correct else -3
+
+    print("\nRecord and re-score example")
+    print("---------------------------")
+    from BlackBoxGame import CELLS, ENTRIES
+
+    rng = random.Random(261)
+    path = os.path.join(tempfile.mkdtemp(), 'games.log')
+    recorded = {}
+    start = time.perf_counter()
+    with EventLog(path) as log:
+        for number in range(20000):
+            game = BlackBoxGame(rng.sample(CELLS, rng.randint(4, 8)), event_log=log)
+            for _ in range(rng.randint(5, 20)):
+                if rng.random() < 0.1:                      # take a shot back now and then
+                    saved = game.snapshot()
+                    game.shoot_ray(*rng.choice(ENTRIES))
+                    game.restore(saved)
+                game.shoot_ray(*rng.choice(ENTRIES))
+            for _ in range(rng.randint(0, 8)):
+                game.guess_atom(*rng.choice(CELLS))
+            if number % 10:                                 # every tenth game is left without an END record
+                log.end(game)
+            recorded[game.get_log_id()] = game.get_score()
+    print('recorded', len(recorded), 'games in %.2fs,' % (time.perf_counter() - start), os.path.getsize(path), 'bytes')
+
+    start = time.perf_counter()
+    replayed = dict((game_id, score) for game_id, score, _ in rescore(path))
+    elapsed = time.perf_counter() - start
+    print('replayed scores match:', replayed == recorded, '%.0f games/s' % (len(replayed) / elapsed))
+
+    flat = list(rescore(path, FlatRayScoring()))
+    print('mean score, standard rules: %.2f, flat ray rules: %.2f'
+          % (sum(recorded.values()) / len(recorded), sum(score for _, score, _ in flat) / len(flat)))
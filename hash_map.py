@@ -9,6 +9,7 @@
 
 # Import pre-written DynamicArray and LinkedList classes
 from a5_include import *
+import instrumentation
 
 
 def hash_function_1(key: str) -> int:
@@ -77,12 +78,19 @@ class HashMap:
         (reaches the end node "None:) returns None. Otherwise, returns the value in the node with the corresponding
         key.
         """
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
         index = self.hash_function(key) % self.capacity
+        if probe is not None:
+            hashed = instrumentation.now()
         bucket = self.buckets[index]
         result = None
         for node in bucket:
             if node.key == key:
                 result = node.value
+        if probe is not None:
+            self._record_chain(probe, 'get', bucket.length(), start, hashed)      # the whole chain is traversed
         return result
 
     def put(self, key: str, value: object) -> None:
@@ -92,7 +100,12 @@ class HashMap:
         of the node. If the key is not found at the hashed index, adds a node with the specified key/value pair to the
         bucket.
         """
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
         index = self.hash_function(key) % self.capacity
+        if probe is not None:
+            hashed = instrumentation.now()
         bucket = self.buckets[index]
         key_present = False
         for node in bucket:
@@ -102,6 +115,8 @@ class HashMap:
         if key_present is False:
             bucket.insert(key, value)
             self.size += 1
+        if probe is not None:
+            self._record_chain(probe, 'put', bucket.length() - (not key_present), start, hashed)  # before the insert
         pass
 
     def remove(self, key: str) -> None:
@@ -109,10 +124,19 @@ class HashMap:
         Hashes the key to locate the corresponding bucket in the table. Calls the LinkedList remove function to remove
         a node in the list with the corresponding key.
         """
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
         index = self.hash_function(key) % self.capacity
+        if probe is not None:
+            hashed = instrumentation.now()
+            nodes = self._search_length(self.buckets[index], key)
+            walk = instrumentation.now()                    # the count of nodes is not part of the traversal
         bucket = self.buckets[index]
         if bucket.remove(key):
             self.size -= 1
+        if probe is not None:
+            self._record_chain(probe, 'remove', nodes, start, hashed, walk)
         pass
 
     def contains_key(self, key: str) -> bool:
@@ -125,12 +149,65 @@ class HashMap:
         if self.size == 0:
             return False
         else:
+            probe = instrumentation.active
+            if probe is not None:
+                start = instrumentation.now()
             index = self.hash_function(key) % self.capacity
+            if probe is not None:
+                hashed = instrumentation.now()
+                nodes = self._search_length(self.buckets[index], key)
+                walk = instrumentation.now()                # the count of nodes is not part of the traversal
             bucket = self.buckets[index]
-            if bucket.contains(key) is None:
-                return False
-            else:
-                return True
+            contains = bucket.contains(key) is not None
+            if probe is not None:
+                self._record_chain(probe, 'contains_key', nodes, start, hashed, walk)
+            return contains
+
+    def _search_length(self, bucket, key) -> int:
+        """
+        Returns the number of nodes a search of the bucket for the key visits: up to and including the node with the
+        key, or every node if the key is not in the bucket.
+        """
+        nodes = 0
+        for node in bucket:
+            nodes += 1
+            if node.key == key:
+                break
+        return nodes
+
+    def _record_chain(self, probe, operation, nodes, start, hashed, walk=None) -> None:
+        """
+        Records one hash call and the traversal of a bucket's chain to the instrumentation probe: the number of
+        traversals and of nodes traversed, the most nodes traversed at once, the nanoseconds spent hashing (from start
+        to hashed) and traversing (from walk on, which is hashed unless nodes had to be counted in between), and the
+        calls and nanoseconds of the operation, which are those of the hashing and the traversal.
+        """
+        end = instrumentation.now()
+        if walk is None:
+            walk = hashed
+        probe.add('hash_map.hash_calls')
+        probe.add('hash_map.hash_ns', hashed - start)
+        probe.add('hash_map.chain_traversals')
+        probe.add('hash_map.chain_nodes', nodes)
+        probe.maximum('hash_map.chain_nodes_max', nodes)
+        probe.add('hash_map.chain_ns', end - walk)
+        probe.add('hash_map.' + operation + '_calls')
+        probe.add('hash_map.' + operation + '_ns', (hashed - start) + (end - walk))
+
+    def _timed_hash(self, probe):
+        """
+        Returns the hash function wrapped to add the nanoseconds of every call to the probe's hash_ns counter
+        """
+        function = self.hash_function
+        now = instrumentation.now
+
+        def timed(key):
+            start = now()
+            hash = function(key)
+            probe.add('hash_map.hash_ns', now() - start)
+            return hash
+
+        return timed
 
 
     def empty_buckets(self) -> int:
@@ -173,6 +250,11 @@ class HashMap:
         capacity is officially updated to the new capacity and the new array of buckets overwrites the old one.
         """
         if new_capacity >= 1:
+            probe = instrumentation.active
+            function = self.hash_function
+            if probe is not None:
+                start = instrumentation.now()
+                function = self._timed_hash(probe)
             new_buckets = DynamicArray()
             for _ in range(new_capacity):
                 new_buckets.append(LinkedList())
@@ -180,10 +262,15 @@ class HashMap:
                 bucket = self.buckets[i]
                 if bucket.length() > 0:
                     for node in bucket:
-                        new_index = self.hash_function(node.key) % new_capacity
+                        new_index = function(node.key) % new_capacity
                         new_buckets[new_index].insert(node.key, node.value)
             self.capacity = new_capacity
             self.buckets = new_buckets
+            if probe is not None:
+                probe.add('hash_map.resizes')
+                probe.add('hash_map.hash_calls', self.size)         # every node is rehashed
+                probe.add('hash_map.resize_rehashed', self.size)
+                probe.add('hash_map.resize_ns', instrumentation.now() - start)
         pass
 
     def get_keys(self) -> DynamicArray:
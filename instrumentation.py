@@ -0,0 +1,214 @@
+# Author: Chelsey Beck
+# Date: 10/19/2026
+# Description: Opt-in instrumentation for HashMap, MinHeap and the Ray tracer of BlackBoxGame. While instrumentation
+# is enabled, the hot paths of those classes add to named counters of the active Probe (operations, nodes traversed,
+# comparisons, swaps, steps, elapsed nanoseconds, ...). While it is disabled, the only cost is one check of `active`
+# per operation. Counters are read with snapshot() and cleared with reset().
+# A SamplingProfiler attributes time to the public methods of registered classes by periodically sampling the stack
+# of the profiled thread from a background thread.
+
+from time import perf_counter_ns
+import sys
+import threading
+
+active = None                               # the Probe that instrumented code records to, or None while disabled
+
+
+class Probe:
+    """
+    Represents a set of named counters. Names are prefixed by the instrumented module, for example
+    'hash_map.chain_nodes' or 'min_heap.swaps'; counters ending in '_ns' hold elapsed nanoseconds and counters ending
+    in '_max' hold the largest value seen.
+    """
+
+    def __init__(self):
+        self._counters = {}
+
+    def add(self, name, amount=1):
+        """
+        Adds amount to the counter name
+        """
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def maximum(self, name, value):
+        """
+        Raises the counter name to value if value is larger
+        """
+        if value > self._counters.get(name, value - 1):
+            self._counters[name] = value
+
+    def snapshot(self):
+        """
+        :return: a dict copy of the counters
+        """
+        return dict(self._counters)
+
+    def reset(self):
+        """
+        Clears all counters
+        """
+        self._counters = {}
+
+
+_probe = Probe()
+
+
+def enable():
+    """
+    Starts recording to the module's probe; counters recorded before are kept
+    """
+    global active
+    active = _probe
+
+
+def disable():
+    """
+    Stops recording; the counters recorded so far can still be read
+    """
+    global active
+    active = None
+
+
+def is_enabled():
+    """
+    :return: True while instrumentation is enabled
+    """
+    return active is not None
+
+
+def snapshot():
+    """
+    :return: a dict of counter name -> value
+    """
+    return _probe.snapshot()
+
+
+def reset():
+    """
+    Clears all counters
+    """
+    _probe.reset()
+
+
+def now():
+    """
+    :return: a timestamp in nanoseconds for timing instrumented code
+    """
+    return perf_counter_ns()
+
+
+class SamplingProfiler:
+    """
+    Represents a sampling profiler for the thread that starts it. Every interval seconds a background thread looks at
+    the profiled thread's stack and charges the sample to the innermost public method of a registered class, or to
+    None if no registered method is running.
+    """
+
+    def __init__(self, *classes, interval=0.001):
+        """
+        :param classes: the classes whose public methods (names not starting with an underscore) time is attributed to
+        :param interval: seconds between samples
+        """
+        self._interval = interval
+        self._methods = {}                  # code object -> 'Class.method'
+        self._samples = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = None
+        for cls in classes:
+            self.register(cls)
+
+    def register(self, cls):
+        """
+        Adds the public methods of cls to the methods samples are attributed to
+        """
+        for name, member in vars(cls).items():
+            function = getattr(member, '__func__', member)
+            if not name.startswith('_') and hasattr(function, '__code__'):
+                self._methods[function.__code__] = cls.__name__ + '.' + name
+
+    def start(self):
+        """
+        Starts sampling the calling thread
+        """
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exception):
+        self.stop()
+
+    def _run(self):
+        """
+        Takes samples until stopped
+        """
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._target)
+            label = None
+            while frame is not None:
+                label = self._methods.get(frame.f_code)
+                if label is not None:
+                    break
+                frame = frame.f_back
+            self._samples[label] = self._samples.get(label, 0) + 1
+
+    def results(self):
+        """
+        :return: a dict of 'Class.method' (or None for time outside registered methods) -> (samples, estimated
+        seconds), from the most to the least sampled
+        """
+        ordered = sorted(list(self._samples.items()), key=lambda item: -item[1])
+        return {label: (samples, samples * self._interval) for label, samples in ordered}
+
+    def reset(self):
+        """
+        Discards the samples taken so far
+        """
+        self._samples = {}
+
+
+# BASIC TESTING
+if __name__ == '__main__':
+    import instrumentation                  # the module the instrumented classes record through, not __main__
+    from BlackBoxGame import BlackBoxGame
+    from hash_map import HashMap, hash_function_1
+    from min_heap import MinHeap
+
+    print("\nCounters example")
+    print("----------------")
+    instrumentation.enable()
+    m = HashMap(20, hash_function_1)
+    for i in range(100):
+        m.put('key' + str(i), i)
+    m.resize_table(200)
+    h = MinHeap([5, 9, 2, 7, 1, 8])
+    while not h.is_empty():
+        h.remove_min()
+    game = BlackBoxGame([(3, 2), (3, 7), (6, 4), (8, 7)])
+    for column in range(1, 9):
+        game.shoot_ray(0, column)
+    instrumentation.disable()
+    for name, value in sorted(instrumentation.snapshot().items()):
+        print(name, value)
+    instrumentation.reset()
+    print(instrumentation.snapshot())
+
+    print("\nSampling profiler example")
+    print("-------------------------")
+    with instrumentation.SamplingProfiler(HashMap, MinHeap, BlackBoxGame) as profiler:
+        for i in range(50000):
+            m.put('key' + str(i % 1000), i)
+            m.get('key' + str(i % 700))
+    print(profiler.results())
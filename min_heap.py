@@ -4,11 +4,13 @@
 # Description: A Min-Heap ADT utilizing a DynamicArray data structure. The first index contains the node with the min
 # key value or highest priority level. The heap is maintained as a complete tree with the final level being filled
 # from left to right. The only data member is the array containing the keys in the heap. Contains methods is_empty,
-# add, get_min, remove_min, and build_heap.
+# add, get_min, remove_min, replace_min, and build_heap.
+# TopKHeap keeps the k largest nodes of a stream in a MinHeap of fixed capacity k, for running leaderboards.
 
 
 # Import pre-written DynamicArray and LinkedList classes
 from a5_include import *
+import instrumentation
 
 
 class MinHeapException(Exception):
@@ -55,6 +57,9 @@ class MinHeap:
         updated and the new parent index is calculated. The comparison and swaps continue until the new node is placed
         in the correct index position.
         """
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
         self.heap.append(node)
         i = self.heap.length()-1
         pi = (i-1)//2
@@ -62,6 +67,9 @@ class MinHeap:
             self.heap.swap(i, pi)
             i = pi
             pi = (i-1)//2
+        if probe is not None:
+            depth = self.heap.length().bit_length() - (i + 1).bit_length()      # levels the node moved up
+            self._record_sift(probe, 'add', depth, depth + (i > 0), start)   # one more compare unless at the root
         pass
 
     def get_min(self) -> object:
@@ -86,6 +94,9 @@ class MinHeap:
         if self.is_empty():
             raise MinHeapException
         else:
+            probe = instrumentation.active
+            if probe is not None:
+                start = instrumentation.now()
             self.heap.swap(0, self.heap.length() - 1)
             min = self.heap.pop()
             i = 0                                               # the swapped node is at index 0
@@ -100,8 +111,68 @@ class MinHeap:
                     ic = (2 * i) + 1                            # update child index to left child and repeat loop
                 else:                                           # if the node does not need to be swapped, we're done
                     break
+            if probe is not None:
+                self._record_sift(probe, 'remove_min', (i + 1).bit_length() - 1, self._sift_down_compares(i), start)
             return min
 
+    def replace_min(self, node: object) -> object:
+        """
+        For non-empty heaps, removes the minimum key node and adds the new node in one step, returning the removed
+        node. The new node takes the place of the min node at index 0 and is percolated down the heap the same way as
+        in remove_min, so the heap keeps its size and no node is appended or popped.
+        """
+        if self.is_empty():
+            raise MinHeapException
+        probe = instrumentation.active
+        if probe is not None:
+            start = instrumentation.now()
+        min = self.heap[0]
+        self.heap.set_at_index(0, node)
+        n = self.heap.length()
+        i = 0
+        ic = 1
+        while ic < n:                                           # while the node has a left child
+            if ic + 1 < n and self.heap[ic] > self.heap[ic + 1]:    # if the right is the min child
+                ic += 1
+            if self.heap[ic] < self.heap[i]:                    # if the child is less than parent, swap and repeat
+                self.heap.swap(i, ic)
+                i = ic
+                ic = (2 * i) + 1
+            else:
+                break
+        if probe is not None:
+            self._record_sift(probe, 'replace_min', (i + 1).bit_length() - 1, self._sift_down_compares(i), start)
+        return min
+
+    def _sift_down_compares(self, i: int) -> int:
+        """
+        Returns the number of comparisons made by a percolation down from the root that stopped at index i. The path
+        from the root is made of the ancestors of i; at each node the children are compared if there is a right child
+        and the smaller child is compared with the node, and the percolation stops at i after the same comparisons,
+        unless i has no children.
+        """
+        n = self.heap.length()
+        compares = 0
+        if (2 * i) + 1 < n:
+            compares += 1 + ((2 * i) + 2 < n)
+        while i > 0:
+            i = (i - 1) // 2
+            compares += 1 + ((2 * i) + 2 < n)
+        return compares
+
+    def _record_sift(self, probe, operation: str, depth: int, compares: int, start: int) -> None:
+        """
+        Records a percolation to the instrumentation probe: comparisons, swaps (one per level moved), the sift depth
+        in total and at most, and the nanoseconds since start, in total and per operation.
+        """
+        elapsed = instrumentation.now() - start
+        probe.add('min_heap.comparisons', compares)
+        probe.add('min_heap.swaps', depth)
+        probe.add('min_heap.sift_depth', depth)
+        probe.maximum('min_heap.sift_depth_max', depth)
+        probe.add('min_heap.' + operation + '_calls')
+        probe.add('min_heap.' + operation + '_ns', elapsed)
+
     def build_heap(self, da: DynamicArray) -> None:
         """
         Builds a valid heap from an unordered array and replaces the current heap dynamic array with the newly built
@@ -131,6 +202,108 @@ class MinHeap:
         pass
 
 
+class TopKHeap:
+    """
+    Keeps the k largest nodes seen in a MinHeap holding at most k nodes, so memory stays constant however long the
+    stream is. The smallest kept node is at the root: once the heap is full, a new node is admitted only if it is
+    greater than that node, and then takes its place with a single replace_min. Nodes equal to the smallest kept node
+    are not admitted, so among equal nodes the first ones seen are kept. Nodes must be comparable with < and >; use
+    (score, name) tuples to rank named entries by score.
+    """
+
+    def __init__(self, k: int, start_nodes=None):
+        """
+        :param k: the number of nodes to keep (at least 1)
+        :param start_nodes: nodes to push first (optional)
+        """
+        if k < 1:
+            raise MinHeapException
+        self._k = k
+        self._heap = MinHeap()
+        self._size = 0
+        self._min = None                    # the smallest kept node once the heap is full
+        if start_nodes:
+            self.push_all(start_nodes)
+
+    def __str__(self) -> str:
+        return 'TOPK %d ' % self._k + str(self._heap.heap)
+
+    def capacity(self) -> int:
+        """
+        Returns k, the number of nodes the heap keeps
+        """
+        return self._k
+
+    def length(self) -> int:
+        """
+        Returns the number of nodes kept so far
+        """
+        return self._size
+
+    def is_full(self) -> bool:
+        """
+        Returns True if k nodes are kept, so a new node must beat the smallest one to be admitted
+        """
+        return self._size == self._k
+
+    def get_min(self) -> object:
+        """
+        Returns the smallest kept node, which a new node must beat once the heap is full
+        """
+        return self._heap.get_min()
+
+    def push(self, node: object) -> bool:
+        """
+        Offers a node from the stream. Returns True if it is kept, False if the heap is full and the node is not greater
+        than the smallest kept node.
+        """
+        if self._size < self._k:
+            self._heap.add(node)
+            self._size += 1
+            if self._size == self._k:
+                self._min = self._heap.get_min()
+            return True
+        if node > self._min:
+            self._heap.replace_min(node)
+            self._min = self._heap.get_min()
+            return True
+        return False
+
+    def push_all(self, nodes) -> int:
+        """
+        Offers every node of an iterable, in order. Returns the number of nodes kept when they were offered.
+        """
+        kept = 0
+        iterator = iter(nodes)
+        for node in iterator:                   # fill the heap
+            kept += self.push(node)
+            if self._size == self._k:
+                break
+        heap = self._heap
+        smallest = self._min
+        for node in iterator:                   # full: most nodes are rejected by a single comparison
+            if node > smallest:
+                heap.replace_min(node)
+                smallest = heap.get_min()
+                kept += 1
+        self._min = smallest
+        return kept
+
+    def merge(self, other: 'TopKHeap') -> 'TopKHeap':
+        """
+        Combines the nodes kept by another TopKHeap (for example the result of another worker) into this one and returns
+        this heap, which then keeps the k largest nodes of both streams. The other heap is not changed.
+        """
+        self.push_all(other.nodes())
+        return self
+
+    def nodes(self) -> list:
+        """
+        Returns the kept nodes from the largest to the smallest
+        """
+        return sorted((self._heap.heap[i] for i in range(self._size)), reverse=True)
+
+
 # BASIC TESTING
 if __name__ == '__main__':
 
@@ -176,3 +349,27 @@ if __name__ == '__main__':
     da.set_at_index(0, 500)
     print(da)
     print(h)
+
+
+    print("\nreplace_min example 1")
+    print("---------------------")
+    h = MinHeap([1, 10, 2, 9, 3, 8, 4, 7, 5, 6])
+    print(h.replace_min(11), h)
+    print(h.replace_min(0), h)
+
+
+    print("\nTopKHeap example 1")
+    print("------------------")
+    top = TopKHeap(3)
+    for score in [5, 1, 9, 7, 3, 9, 12, 2]:
+        print(score, top.push(score), top)
+    print(top.nodes(), top.get_min())
+
+    print("\nTopKHeap merge example 1")
+    print("------------------------")
+    workers = [TopKHeap(3, [(20, 'ann'), (14, 'bo'), (25, 'cy')]), TopKHeap(3, [(18, 'di'), (30, 'ed')]),
+               TopKHeap(3, [(21, 'flo'), (9, 'gus'), (16, 'hal'), (24, 'ivy')])]
+    leaderboard = TopKHeap(3)
+    for worker in workers:
+        leaderboard.merge(worker)
+    print(leaderboard.nodes())